@@ -3,30 +3,88 @@ AI-powered email classification using Google Gemini API
 Intelligent detection of job-related emails vs promotional/spam content
 """
 
+from __future__ import annotations
+
 import os
+import asyncio
+import logging
 import json
 import re
-from typing import Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+import hashlib
+import sqlite3
+import atexit
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+_log = logging.getLogger(__name__)
 
-# Load environment variables from .env file
 try:
-    from dotenv import load_dotenv
-    load_dotenv()  # Load .env file from current directory
+    import orjson
+    _json_loads = orjson.loads
 except ImportError:
-    print("Warning: python-dotenv not installed. Install with: pip install python-dotenv")
+    _json_loads = json.loads
 
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
 except ImportError:
-    GEMINI_AVAILABLE = False
-    print("Warning: google-generativeai not available. Install with: pip install google-generativeai")
+    AIOHTTP_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def _load_env_once() -> None:
+    """Load environment variables from .env file (first call only)"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()  # Load .env file from current directory
+    except ImportError:
+        _log.warning("python-dotenv not installed. Install with: pip install python-dotenv")
 
 
-@dataclass
+@lru_cache(maxsize=None)
+def _load_requests():
+    """
+    Import requests on first use
+    
+    Only classifiers with an API key make HTTP calls, so rule-based use never
+    pays for the import.
+    
+    Returns:
+        The requests module, or None if it is not installed
+    """
+    try:
+        import requests
+        return requests
+    except ImportError:
+        _log.warning("requests not available. Install with: pip install requests")
+        return None
+
+
+# Email dict as produced by gmail_utils.fetch_interview_emails. Functional
+# syntax because 'from' is a keyword.
+EmailData = TypedDict('EmailData', {
+    'message_id': str,
+    'subject': str,
+    'from': str,
+    'date': str,
+    'snippet': str,
+    'body': str,
+}, total=False)
+
+
+def _unpack_email(email_data: EmailData) -> Tuple[str, str, str, str]:
+    """Read (subject, from, body, snippet) from an email dict in one pass"""
+    get = email_data.get
+    return get('subject', ''), get('from', ''), get('body', ''), get('snippet', '')
+
+
+@dataclass(slots=True, frozen=True)
 class EmailClassification:
-    """Results of email classification"""
+    """Results of email classification (immutable, so cached instances can be shared)"""
     category: str  # 'job_interview', 'job_application', 'promotional', 'irrelevant'
     confidence: float  # 0.0 to 1.0
     reasoning: str
@@ -34,6 +92,376 @@ class EmailClassification:
     role: Optional[str] = None
     interview_scheduled: bool = False
     status_suggestion: str = 'applied'
+    model: Optional[str] = None  # Gemini model that produced it; None for rules and semantic hits
+    
+    @property
+    def is_fallback(self) -> bool:
+        """True when rules, not the model, produced this result"""
+        return self.reasoning.startswith((_FALLBACK_REASON_PREFIX, 'Rule-based:'))
+
+
+# Gemini models and REST endpoint (every call sends the classifier's own API key)
+GEMINI_MODEL = 'gemini-2.5-flash'
+FAST_GEMINI_MODEL = 'gemini-2.5-flash-lite'
+# Bump whenever the prompt, schemas or pre-filter rules change, so cached and
+# stored classifications from the old behaviour are redone
+CLASSIFIER_VERSION = 2
+ESCALATION_CONFIDENCE = 0.7
+GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent'
+ASYNC_MAX_CONCURRENCY = 16
+WORKER_POOL_SIZE = 16
+
+# Exact-match classification cache settings (SQLite, one row per entry)
+CLASSIFICATION_CACHE_FILE = '.classification_cache.db'
+CLASSIFICATION_CACHE_SIZE = 4096
+
+_URL_RE = re.compile(r"https?://\S+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_FALLBACK_REASON_PREFIX = 'Fallback classification'
+_SEMANTIC_REASON = 'Semantic cache: near-duplicate of an earlier email'
+
+# Email content budget sent to the model
+MAX_CONTENT_TOKENS = 400
+MAX_CONTENT_CHARS = 2000  # used when no tokenizer is installed
+_HTML_BLOCK_RE = re.compile(r"<(script|style|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+@lru_cache(maxsize=None)
+def _get_token_encoder():
+    """Load the tiktoken encoder used to approximate Gemini token counts, or None"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _get_executor() -> ThreadPoolExecutor:
+    """Worker pool shared by every classifier for concurrent batch calls"""
+    executor = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix='email-classifier')
+    atexit.register(executor.shutdown, wait=False)
+    return executor
+
+
+def _truncate_to_tokens(content: str, max_tokens: int) -> str:
+    """Trim content to roughly max_tokens, falling back to a character limit"""
+    encoder = _get_token_encoder()
+    if encoder is None:
+        if len(content) > MAX_CONTENT_CHARS:
+            return content[:MAX_CONTENT_CHARS] + "... [truncated]"
+        return content
+    
+    tokens = encoder.encode(content, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return content
+    return encoder.decode(tokens[:max_tokens]) + " ... [truncated]"
+
+
+def classification_source(result: EmailClassification) -> Optional[str]:
+    """
+    Label identifying which model and classifier version produced a result
+    
+    Returns:
+        str like 'gemini-2.5-flash@v2', or None for results that are not
+        model output (pre-filter, rule fallback, semantic cache hits)
+    """
+    if result.model is None:
+        return None
+    return f'{result.model}@v{CLASSIFIER_VERSION}'
+
+
+# Labels of stored classifications that are still current
+CLASSIFICATION_SOURCES = tuple(f'{model}@v{CLASSIFIER_VERSION}' for model in (GEMINI_MODEL, FAST_GEMINI_MODEL))
+
+
+def email_cache_key(email_data: EmailData) -> str:
+    """
+    Build a stable cache key for an email from its normalized content.
+    
+    Sender, subject and body (or snippet) are lowercased, stripped of URLs
+    (tracking links differ between otherwise identical resends) and
+    whitespace-collapsed before hashing.
+    """
+    subject, from_email, body, snippet = _unpack_email(email_data)
+    normalized = '\x1f'.join(
+        _WHITESPACE_RE.sub(' ', _URL_RE.sub('', part.lower())).strip()
+        for part in (str(CLASSIFIER_VERSION), from_email, subject, body or snippet)
+    )
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Keyword indicators for the rule-based fallback, compiled once into single
+# alternations so each check is one regex pass instead of a Python loop
+PROMOTIONAL_INDICATORS = [
+    'job alert', 'job recommendation', 'unsubscribe', 'click here to apply',
+    'thousands of jobs', 'job match', 'career newsletter', 'job digest'
+]
+INTERVIEW_INDICATORS = [
+    'interview scheduled', 'interview confirmed', 'please join',
+    'zoom link', 'meeting link', 'interview invitation'
+]
+_PROMOTIONAL_RE = re.compile('|'.join(map(re.escape, PROMOTIONAL_INDICATORS)))
+_INTERVIEW_RE = re.compile('|'.join(map(re.escape, INTERVIEW_INDICATORS)))
+
+# Pre-filter sender lists. Job-alert addresses are promotional without asking
+# the model. The rest of a job board's mail (Easy Apply confirmations,
+# recruiter messages) is only promotional with promotional wording too;
+# applicant-tracking systems relay real recruiter mail and are always sent on.
+JOB_ALERT_SENDERS = frozenset({
+    'jobalerts-noreply@linkedin.com', 'jobs-listings@linkedin.com',
+    'alert@indeed.com', 'donotreply@jobalert.indeed.com'
+})
+JOB_BOARD_DOMAINS = frozenset({
+    'naukri.com', 'linkedin.com', 'indeed.com', 'shine.com', 'monster.com',
+    'timesjobs.com', 'foundit.in', 'glassdoor.com'
+})
+ATS_DOMAINS = frozenset({
+    'greenhouse.io', 'lever.co', 'myworkday.com', 'myworkdayjobs.com',
+    'smartrecruiters.com', 'ashbyhq.com', 'icims.com', 'workablemail.com'
+})
+PREFILTER_MIN_PROMOTIONAL_HITS = 2
+
+
+def _domain_in(domain: str, domains: frozenset) -> bool:
+    """Whether domain is one of domains or a subdomain of one"""
+    parts = domain.split('.')
+    return any('.'.join(parts[i:]) in domains for i in range(len(parts) - 1))
+
+# Batch classification limits (keeps each prompt well under the token limit)
+BATCH_MAX_EMAILS = 10
+BATCH_CHAR_BUDGET = 15000
+
+# Response schemas enforced server-side (constrained decoding), shared by the
+# sync and async paths. Field descriptions replace the old in-prompt field list.
+CLASSIFICATION_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'category': {
+            'type': 'STRING',
+            'enum': ['job_interview', 'job_application', 'promotional', 'irrelevant'],
+            'description': 'job_interview: schedules/confirms an actual interview; '
+                           'job_application: application confirmation or status update; '
+                           'promotional: marketing from job boards or recruiting agencies; '
+                           'irrelevant: not related to job searching',
+        },
+        'confidence': {'type': 'NUMBER', 'description': 'Confidence between 0.0 and 1.0'},
+        'reasoning': {'type': 'STRING', 'description': 'Brief explanation of the decision'},
+        'company': {'type': 'STRING', 'nullable': True, 'description': 'Actual company (not job board)'},
+        'role': {'type': 'STRING', 'nullable': True, 'description': 'Job role/position if mentioned'},
+        'interview_scheduled': {'type': 'BOOLEAN', 'description': 'Schedules a specific interview'},
+        'status_suggestion': {
+            'type': 'STRING',
+            'enum': ['applied', 'interview_scheduled', 'interviewed', 'rejected', 'offer', 'accepted'],
+        },
+    },
+    'required': ['category', 'confidence', 'reasoning', 'interview_scheduled', 'status_suggestion'],
+}
+BATCH_CLASSIFICATION_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {'results': {'type': 'ARRAY', 'items': CLASSIFICATION_SCHEMA}},
+    'required': ['results'],
+}
+
+# Static instructions shared by every request, sent as the system instruction
+_SYSTEM_INSTRUCTION = """You are an expert email classifier for a job application tracking system.
+Classify each email you are given.
+
+Focus on:
+- Is this from an actual company or a job board/recruiting platform?
+- Does it contain specific interview scheduling details?
+- Is the language personalized or generic/mass-marketing?
+- Are there specific company names, roles, interview times mentioned?"""
+
+
+def _request_body(prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a generateContent request for a prompt with schema-constrained JSON output"""
+    return {
+        'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+        'generationConfig': {'responseMimeType': 'application/json', 'responseSchema': schema},
+        'systemInstruction': {'parts': [{'text': _SYSTEM_INSTRUCTION}]},
+    }
+
+
+def _response_text(data: Dict[str, Any]) -> str:
+    """Join the text parts of a generateContent response"""
+    parts = data['candidates'][0]['content']['parts']
+    return ''.join(part.get('text', '') for part in parts)
+
+
+# Semantic (near-duplicate) classification cache settings
+SEMANTIC_CACHE_FILE = '.semantic_cache{suffix}.db'  # one file per API key
+SEMANTIC_CACHE_MODEL = 'all-MiniLM-L6-v2'
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_PER_CATEGORY = 2048
+
+
+def _semantic_cache_path(api_key: Optional[str]) -> str:
+    """Semantic cache file for an API key, so users never see each other's emails"""
+    if not api_key:
+        return SEMANTIC_CACHE_FILE.format(suffix='')
+    return SEMANTIC_CACHE_FILE.format(suffix='-' + hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest())
+
+
+def _sender_address(from_email: str) -> str:
+    """Extract the lowercased sender address from a From header value"""
+    return from_email.lower().rsplit('<', 1)[-1].rstrip('> ')
+
+
+def _sender_domain(from_email: str) -> str:
+    """Extract the sender's domain from a From header value"""
+    address = _sender_address(from_email)
+    return address.rsplit('@', 1)[-1] if '@' in address else address
+
+
+def is_job_alert_sender(from_email: str) -> bool:
+    """Whether the email comes from a known job-alert address"""
+    return _sender_address(from_email or '') in JOB_ALERT_SENDERS
+
+
+_sentence_encoder_lock = threading.Lock()
+
+
+def _get_sentence_encoder():
+    """Return the embedding model shared by every semantic cache, or None"""
+    # Serialized so concurrent first calls don't each load the ~90 MB model
+    with _sentence_encoder_lock:
+        return _load_sentence_encoder()
+
+
+@lru_cache(maxsize=None)
+def _load_sentence_encoder():
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(SEMANTIC_CACHE_MODEL, device='cpu')
+    except Exception as e:
+        _log.info("Semantic cache disabled: %s", e)
+        return None
+
+
+class SemanticClassificationCache:
+    """
+    Near-duplicate classification cache backed by sentence embeddings.
+    
+    Job alerts are mostly the same template with different job titles, so an
+    exact hash misses them. Each classified email is embedded once and stored
+    per category; a lookup returns the category, confidence and status of the
+    most similar email from the same sender domain when cosine similarity
+    exceeds the threshold. Company, role and interview details belong to that
+    other email, so they are left for the parser. Requires
+    sentence-transformers; disabled otherwise.
+    """
+    
+    def __init__(self, path: str = SEMANTIC_CACHE_FILE.format(suffix=''),
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        # category -> (embeddings (N, dim) L2-normalized, sender domains, results)
+        self._index: Dict[str, Tuple[Any, list, list]] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._load()
+    
+    def embed(self, email_content: str):
+        """Return the L2-normalized embedding for prepared email content, or None"""
+        encoder = _get_sentence_encoder()
+        if encoder is None:
+            return None
+        return encoder.encode(email_content, normalize_embeddings=True)
+    
+    def lookup(self, embedding, from_email: str) -> Optional[EmailClassification]:
+        """Return the category-level classification of the closest matching email"""
+        if embedding is None:
+            return None
+        domain = _sender_domain(from_email)
+        best_score, best_result = self.threshold, None
+        with self._lock:
+            index = list(self._index.values())
+        for matrix, domains, results in index:
+            scores = matrix @ embedding
+            # Best match from the same sender domain: the same template from a
+            # different sender is not the same email
+            for idx in sorted((scores >= best_score).nonzero()[0], key=lambda i: -scores[i]):
+                if domains[idx] == domain:
+                    best_score, best_result = float(scores[idx]), results[idx]
+                    break
+        if best_result is None:
+            return None
+        # ATS senders use one template for every company, so only the verdict carries over
+        return EmailClassification(
+            category=best_result.category,
+            confidence=best_result.confidence,
+            reasoning=_SEMANTIC_REASON,
+            status_suggestion=best_result.status_suggestion,
+        )
+    
+    def add(self, embedding, from_email: str, result: EmailClassification):
+        """Index a classification under its category"""
+        if embedding is None:
+            return
+        import numpy as np
+        
+        domain = _sender_domain(from_email)
+        embedding = embedding.astype(np.float32)
+        with self._lock:
+            matrix, domains, results = self._index.get(
+                result.category, (np.empty((0, embedding.shape[0]), dtype=np.float32), [], [])
+            )
+            matrix = np.vstack([matrix, embedding])[-SEMANTIC_CACHE_MAX_PER_CATEGORY:]
+            domains = (domains + [domain])[-SEMANTIC_CACHE_MAX_PER_CATEGORY:]
+            results = (results + [result])[-SEMANTIC_CACHE_MAX_PER_CATEGORY:]
+            self._index[result.category] = (matrix, domains, results)
+            trimmed = len(results) == SEMANTIC_CACHE_MAX_PER_CATEGORY
+        # Persist just the new row, outside the index lock
+        self._save_entry(result.category, domain, embedding, result, trimmed)
+    
+    def _load(self):
+        """Load persisted entries, starting empty on any error"""
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, category TEXT NOT NULL, '
+                    'domain TEXT NOT NULL, embedding BLOB NOT NULL, result TEXT NOT NULL)'
+                )
+                self._db.execute('CREATE INDEX IF NOT EXISTS idx_entries_category ON entries (category, id)')
+            stored = self._db.execute('SELECT category, domain, embedding, result FROM entries ORDER BY id').fetchall()
+            if stored:
+                import numpy as np
+            rows: Dict[str, Tuple[list, list, list]] = {}
+            for category, domain, embedding, result in stored:
+                vectors, domains, results = rows.setdefault(category, ([], [], []))
+                vectors.append(np.frombuffer(embedding, dtype=np.float32))
+                domains.append(domain)
+                results.append(EmailClassification(**_json_loads(result)))
+            self._index = {
+                category: (np.vstack(vectors), domains, results)
+                for category, (vectors, domains, results) in rows.items()
+            }
+        except Exception as e:
+            _log.warning("Could not load semantic cache: %s", e)
+            self._db = None
+    
+    def _save_entry(self, category: str, domain: str, embedding, result: EmailClassification, trimmed: bool):
+        """Append one entry (and drop rows trimmed from its category) without rewriting the rest"""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    'INSERT INTO entries (category, domain, embedding, result) VALUES (?, ?, ?, ?)',
+                    (category, domain, embedding.tobytes(), json.dumps(asdict(result)))
+                )
+                if trimmed:
+                    self._db.execute(
+                        'DELETE FROM entries WHERE category = ? AND id NOT IN '
+                        '(SELECT id FROM entries WHERE category = ? ORDER BY id DESC LIMIT ?)',
+                        (category, category, SEMANTIC_CACHE_MAX_PER_CATEGORY)
+                    )
+        except Exception as e:
+            _log.warning("Could not save semantic cache: %s", e)
 
 
 class GeminiEmailClassifier:
@@ -41,28 +469,46 @@ class GeminiEmailClassifier:
     
     def __init__(self, api_key: Optional[str] = None):
         """Initialize Gemini classifier with API key"""
+        _load_env_once()
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.model = None
+        self.fast_model = None
+        self._sync_session = None
+        self.enable_escalation = True
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._cache_db = None
+        self._cache = self._load_cache()
+        self._semantic_cache = SemanticClassificationCache(_semantic_cache_path(self.api_key))
+        self._http_session = None
+        self._http_session_loop = None
+        self._async_semaphore = None
         
         if not self.api_key:
-            print("Warning: No Gemini API key found. Set GEMINI_API_KEY environment variable or pass api_key parameter")
-            print("Get your API key from: https://makersuite.google.com/app/apikey")
+            _log.warning(
+                "No Gemini API key found. Set GEMINI_API_KEY environment variable or pass api_key parameter. "
+                "Get your API key from: https://makersuite.google.com/app/apikey"
+            )
             return
             
-        if not GEMINI_AVAILABLE:
-            print("Error: google-generativeai package not installed")
+        requests = _load_requests()
+        if requests is None:
+            _log.error("requests package not installed")
             return
-            
-        try:
-            genai.configure(api_key=self.api_key)
-            # Use the current stable model
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            print("Gemini AI classifier initialized successfully")
-        except Exception as e:
-            print(f"Error initializing Gemini: {e}")
-            self.model = None
+        
+        # The key travels on this instance's session, never through process-global
+        # SDK configuration, so classifiers for different keys can coexist
+        self._sync_session = requests.Session()
+        self._sync_session.headers['x-goog-api-key'] = self.api_key
+        self._sync_session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=WORKER_POOL_SIZE))
+        # Use the current stable model; the static instructions travel as a
+        # system instruction so each prompt carries only the email(s)
+        self.model = GEMINI_MODEL
+        # Cheaper model for first-pass triage; ambiguous results escalate to self.model
+        self.fast_model = FAST_GEMINI_MODEL
+        _log.info("Gemini AI classifier initialized successfully")
     
-    def classify_email(self, email_data: Dict[str, Any]) -> EmailClassification:
+    def classify_email(self, email_data: EmailData) -> EmailClassification:
         """
         Classify email using AI
         
@@ -72,41 +518,390 @@ class GeminiEmailClassifier:
         Returns:
             EmailClassification: Classification results
         """
+        return self.classify_emails([email_data])[0]
+    
+    def classify_emails(self, emails: List[EmailData]) -> List[EmailClassification]:
+        """
+        Classify several emails, packing uncached ones into shared prompts
+        
+        Batches are independent API calls, so when there is more than one
+        they run concurrently on the worker pool.
+        
+        Args:
+            emails: List of dicts containing 'subject', 'from', 'body', 'snippet'
+            
+        Returns:
+            List[EmailClassification]: Classification results in input order
+        """
         if not self.model:
             # Fallback to rule-based classification
+            return [self._fallback_classification(email_data) for email_data in emails]
+        
+        results: List[Optional[EmailClassification]] = [None] * len(emails)
+        pending = []  # (index, cache key, prepared content, embedding, in-flight future)
+        waiting = []  # (index, future owned by another caller)
+        
+        for i, email_data in enumerate(emails):
+            cached, cache_key, email_content, embedding = self._lookup_cached(email_data)
+            if cached is not None:
+                results[i] = cached
+                continue
+            
+            # Identical emails already being classified share that call's result
+            future, owner = self._claim_inflight(cache_key)
+            if owner:
+                pending.append((i, cache_key, email_content, embedding, future))
+            else:
+                waiting.append((i, future))
+        
+        try:
+            batches = self._split_batches(pending)
+            contents = [[email_content for _, _, email_content, _, _ in batch] for batch in batches]
+            run = _get_executor().map if len(batches) > 1 else map
+            for batch, batch_results in zip(batches, run(self._classify_batch, contents)):
+                for (i, cache_key, _, embedding, future), result in zip(batch, batch_results):
+                    results[i] = self._store_result(emails[i], cache_key, embedding, result)
+                    self._resolve_inflight(cache_key, future, results[i])
+        except BaseException as e:
+            for _, cache_key, _, _, future in pending:
+                if not future.done():
+                    self._resolve_inflight(cache_key, future, error=e)
+            raise
+        
+        for i, future in waiting:
+            results[i] = future.result()
+        
+        return results
+    
+    async def classify_email_async(self, email_data: EmailData) -> EmailClassification:
+        """
+        Classify email using AI without blocking the event loop
+        
+        Calls the Generative Language REST endpoint directly over a pooled
+        aiohttp session, so concurrent calls overlap their network waits
+        instead of each holding a worker thread.
+        
+        Args:
+            email_data: Dict containing 'subject', 'from', 'body', 'snippet'
+            
+        Returns:
+            EmailClassification: Classification results
+        """
+        if not self.model:
             return self._fallback_classification(email_data)
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self.classify_email, email_data)
+        
+        cached, cache_key, email_content, embedding = self._lookup_cached(email_data)
+        if cached is not None:
+            return cached
+        
+        future, owner = self._claim_inflight(cache_key)
+        if not owner:
+            return await asyncio.wrap_future(future)
         
         try:
-            # Prepare email content for AI analysis
-            email_content = self._prepare_email_content(email_data)
+            prompt = self._create_classification_prompt(email_content)
+            result = None
+            if self.enable_escalation and self.fast_model:
+                result = await self._classify_prompt_async(FAST_GEMINI_MODEL, prompt)
+            if result is None or (self.enable_escalation and self.fast_model and self._needs_escalation(result)):
+                result = await self._classify_prompt_async(GEMINI_MODEL, prompt) or result
             
+            result = self._store_result(email_data, cache_key, embedding, result)
+        except BaseException as e:
+            self._resolve_inflight(cache_key, future, error=e)
+            raise
+        
+        self._resolve_inflight(cache_key, future, result)
+        return result
+    
+    async def classify_emails_async(self, emails: List[EmailData]) -> List[EmailClassification]:
+        """
+        Classify several emails concurrently (bounded by ASYNC_MAX_CONCURRENCY)
+        
+        Args:
+            emails: List of dicts containing 'subject', 'from', 'body', 'snippet'
+            
+        Returns:
+            List[EmailClassification]: Classification results in input order
+        """
+        return list(await asyncio.gather(*(self.classify_email_async(email_data) for email_data in emails)))
+    
+    async def _classify_prompt_async(self, model_name: str, prompt: str) -> Optional[EmailClassification]:
+        """Classify one prompt via REST, returning None if the API call fails"""
+        try:
+            session = await self._get_http_session()
+            async with self._async_semaphore:
+                response_text = await self._generate_content_async(session, model_name, prompt)
+            return self._parse_ai_response(response_text, model_name)
+        except Exception as e:
+            _log.warning("AI classification failed: %s", e)
+            return None
+    
+    async def _generate_content_async(self, session, model_name: str, prompt: str) -> str:
+        """POST a prompt to the Gemini REST API and return the response text"""
+        async with session.post(
+            GEMINI_API_URL.format(model=model_name),
+            json=_request_body(prompt, CLASSIFICATION_SCHEMA),
+            headers={'x-goog-api-key': self.api_key},
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return _response_text(data)
+    
+    def _generate_content(self, model_name: str, prompt: str, schema: Dict[str, Any]) -> str:
+        """POST a prompt to the Gemini REST API on the pooled session and return the response text"""
+        response = self._sync_session.post(
+            GEMINI_API_URL.format(model=model_name),
+            json=_request_body(prompt, schema),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return _response_text(response.json())
+    
+    async def _get_http_session(self):
+        """Return a pooled aiohttp session bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http_session is None or self._http_session.closed or self._http_session_loop is not loop:
+            await self._close_stale_http_session()
+            connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60),
+            )
+            self._http_session_loop = loop
+            self._async_semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+        return self._http_session
+    
+    async def _close_stale_http_session(self):
+        """Close the session left by a previous event loop so its connector is released"""
+        session, loop = self._http_session, self._http_session_loop
+        self._http_session = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # Still running in another thread: close it there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            await session.close()
+        except Exception as e:
+            _log.debug("Could not close stale HTTP session: %s", e)
+    
+    async def aclose(self):
+        """Close the pooled HTTP session used by the async API"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+    
+    def _lookup_cached(self, email_data: EmailData) -> Tuple[Optional[EmailClassification], str, Optional[str], Any]:
+        """
+        Look an email up in the exact and semantic caches
+        
+        Returns:
+            Tuple of (cached classification or None, cache key,
+            prepared email content, embedding) for use on a miss
+        """
+        # Obvious promotions never reach the model
+        prefiltered = self._prefilter(email_data)
+        if prefiltered is not None:
+            return prefiltered, '', None, None
+        
+        # Identical emails (resent digests, duplicate alerts) skip the API call
+        cache_key = email_cache_key(email_data)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached, cache_key, None, None
+        
+        # Prepare email content for AI analysis
+        email_content = self._prepare_email_content(email_data)
+        
+        # Paraphrased job alerts match an earlier email semantically
+        embedding = self._semantic_cache.embed(email_content)
+        cached = self._semantic_cache.lookup(embedding, email_data.get('from', ''))
+        if cached is not None:
+            self._cache_put(cache_key, cached)
+        return cached, cache_key, email_content, embedding
+    
+    def _claim_inflight(self, cache_key: str) -> Tuple[Future, bool]:
+        """
+        Register interest in classifying an email (single-flight)
+        
+        Returns:
+            Tuple of (future for the result, True if the caller owns the
+            request and must resolve the future via _resolve_inflight)
+        """
+        with self._lock:
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[cache_key] = future
+            return future, True
+    
+    def _resolve_inflight(self, cache_key: str, future: Future,
+                          result: Optional[EmailClassification] = None,
+                          error: Optional[BaseException] = None):
+        """Publish an owned request's outcome to any callers waiting on it"""
+        with self._lock:
+            self._inflight.pop(cache_key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def _store_result(self, email_data: EmailData, cache_key: str, embedding: Any,
+                      result: Optional[EmailClassification]) -> EmailClassification:
+        """Cache a fresh AI result, or fall back to rules if the AI call failed"""
+        if result is None:
+            _log.info("Falling back to rule-based classification")
+            return self._fallback_classification(email_data)
+        if not result.reasoning.startswith(_FALLBACK_REASON_PREFIX):
+            self._cache_put(cache_key, result)
+            self._semantic_cache.add(embedding, email_data.get('from', ''), result)
+        return result
+    
+    def _split_batches(self, pending: list) -> List[list]:
+        """Group pending emails into batches bounded by count and prompt size"""
+        batches, batch, batch_chars = [], [], 0
+        for item in pending:
+            content_chars = len(item[2])
+            if batch and (len(batch) >= BATCH_MAX_EMAILS or batch_chars + content_chars > BATCH_CHAR_BUDGET):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append(item)
+            batch_chars += content_chars
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _classify_batch(self, email_contents: List[str]) -> List[Optional[EmailClassification]]:
+        """
+        Classify prepared emails, triaging with the fast model first
+        
+        Results the fast model is unsure about (low confidence, or the
+        ambiguous 'job_application' bucket) are re-classified by the full model.
+        """
+        if not (self.enable_escalation and self.fast_model):
+            return self._classify_batch_with(self.model, email_contents)
+        
+        results = self._classify_batch_with(self.fast_model, email_contents)
+        ambiguous = [i for i, result in enumerate(results) if self._needs_escalation(result)]
+        if ambiguous:
+            escalated = self._classify_batch_with(
+                self.model, [email_contents[i] for i in ambiguous]
+            )
+            for i, result in zip(ambiguous, escalated):
+                if result is not None:
+                    results[i] = result
+        return results
+    
+    @staticmethod
+    def _needs_escalation(result: Optional[EmailClassification]) -> bool:
+        """Whether a fast-model result should be re-checked by the full model"""
+        return (
+            result is None
+            or result.confidence < ESCALATION_CONFIDENCE
+            or result.category == 'job_application'
+        )
+    
+    def _classify_batch_with(self, model_name: str, email_contents: List[str]) -> List[Optional[EmailClassification]]:
+        """Classify prepared emails with one API call, or one per email if that fails"""
+        if len(email_contents) > 1:
+            try:
+                prompt = self._create_batch_classification_prompt(email_contents)
+                response_text = self._generate_content(model_name, prompt, BATCH_CLASSIFICATION_SCHEMA)
+                parsed = self._parse_batch_response(response_text, len(email_contents), model_name)
+                if parsed is not None:
+                    return parsed
+                _log.warning("Batch response did not match the number of emails, classifying individually")
+            except Exception as e:
+                _log.warning("Batch AI classification failed: %s", e)
+        
+        return [self._classify_content(model_name, email_content) for email_content in email_contents]
+    
+    def _classify_content(self, model_name: str, email_content: str) -> Optional[EmailClassification]:
+        """Classify a single prepared email, returning None if the API call fails"""
+        try:
             # Create AI prompt
             prompt = self._create_classification_prompt(email_content)
             
             # Get AI response
-            response = self.model.generate_content(prompt)
+            response_text = self._generate_content(model_name, prompt, CLASSIFICATION_SCHEMA)
             
             # Parse AI response
-            return self._parse_ai_response(response.text)
+            return self._parse_ai_response(response_text, model_name)
             
         except Exception as e:
-            print(f"AI classification failed: {e}")
-            print("🔄 Falling back to rule-based classification")
-            return self._fallback_classification(email_data)
+            _log.warning("AI classification failed: %s", e)
+            return None
+    
+    def _load_cache(self) -> "OrderedDict[str, EmailClassification]":
+        """Load the persisted exact-match cache, starting empty on any error"""
+        cache = OrderedDict()
+        try:
+            self._cache_db = sqlite3.connect(CLASSIFICATION_CACHE_FILE, check_same_thread=False)
+            with self._cache_db:
+                self._cache_db.execute(
+                    'CREATE TABLE IF NOT EXISTS classifications (key TEXT PRIMARY KEY, result TEXT NOT NULL)'
+                )
+            # Rows come back oldest write first, so LRU order survives restarts
+            for key, result in self._cache_db.execute('SELECT key, result FROM classifications ORDER BY rowid'):
+                cache[key] = EmailClassification(**_json_loads(result))
+        except Exception as e:
+            _log.warning("Could not load classification cache: %s", e)
+            self._cache_db = None
+        return cache
     
-    def _prepare_email_content(self, email_data: Dict[str, Any]) -> str:
+    def _save_cache_entries(self, entries: List[Tuple[str, EmailClassification]], evicted: Tuple[str, ...] = ()):
+        """Write changed cache entries (and drop evicted ones) without rewriting the rest"""
+        if self._cache_db is None:
+            return
+        try:
+            with self._cache_db:
+                self._cache_db.executemany(
+                    'INSERT OR REPLACE INTO classifications (key, result) VALUES (?, ?)',
+                    [(key, json.dumps(asdict(result))) for key, result in entries]
+                )
+                if evicted:
+                    self._cache_db.executemany(
+                        'DELETE FROM classifications WHERE key = ?', [(key,) for key in evicted]
+                    )
+        except Exception as e:
+            _log.warning("Could not save classification cache: %s", e)
+    
+    def _cache_get(self, key: str) -> Optional[EmailClassification]:
+        """Return a cached classification and mark it as recently used"""
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+    
+    def _cache_put(self, key: str, result: EmailClassification):
+        """Store a classification, evicting the least recently used entry"""
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            evicted = []
+            while len(self._cache) > CLASSIFICATION_CACHE_SIZE:
+                evicted.append(self._cache.popitem(last=False)[0])
+            self._save_cache_entries([(key, result)], tuple(evicted))
+    
+    def _prepare_email_content(self, email_data: EmailData) -> str:
         """Prepare email content for AI analysis"""
-        subject = email_data.get('subject', '')
-        from_email = email_data.get('from', '')
-        body = email_data.get('body', '')
-        snippet = email_data.get('snippet', '')
+        subject, from_email, body, snippet = _unpack_email(email_data)
         
         # Use body if available, otherwise use snippet
         content = body if body and len(body) > len(snippet) else snippet
         
-        # Limit content length to avoid token limits
-        if len(content) > 2000:
-            content = content[:2000] + "... [truncated]"
+        # Markup and boilerplate dominate HTML bodies' token budget
+        if '<' in content:
+            content = _WHITESPACE_RE.sub(' ', _HTML_TAG_RE.sub(' ', _HTML_BLOCK_RE.sub(' ', content))).strip()
+        
+        # Limit content by tokens (what Gemini bills for), not characters
+        content = _truncate_to_tokens(content, MAX_CONTENT_TOKENS)
         
         return f"""
 Email Analysis Request:
@@ -117,88 +912,111 @@ Content: {content}
         """.strip()
     
     def _create_classification_prompt(self, email_content: str) -> str:
-        """Create detailed prompt for AI classification"""
+        """Create prompt for AI classification (instructions live in the system instruction)"""
+        return email_content
+    
+    def _create_batch_classification_prompt(self, email_contents: List[str]) -> str:
+        """Create a prompt that classifies several numbered emails at once"""
+        numbered = "\n\n".join(
+            f"--- EMAIL {i} ---\n{email_content}" for i, email_content in enumerate(email_contents, 1)
+        )
         return f"""
-You are an expert email classifier for a job application tracking system. Analyze the following email and provide a detailed classification.
-
-{email_content}
-
-Please analyze this email and respond with a JSON object containing:
-
-1. "category": One of:
-   - "job_interview": Email is scheduling/confirming an actual job interview
-   - "job_application": Email is about a job application (confirmation, status update)
-   - "promotional": Email is promotional/marketing from job boards, recruiting agencies
-   - "irrelevant": Email is not related to job searching
-
-2. "confidence": Float between 0.0 and 1.0 indicating your confidence in the classification
-
-3. "reasoning": Brief explanation of your classification decision
-
-4. "company": The actual company name (not job board) if identifiable, or null
+Classify each of the following {len(email_contents)} emails independently, returning exactly {len(email_contents)} results in the order given.
 
-5. "role": The job role/position if mentioned, or null
-
-6. "interview_scheduled": Boolean - true if this email is scheduling a specific interview
-
-7. "status_suggestion": One of "applied", "interview_scheduled", "interviewed", "rejected", "offer", "accepted"
-
-Focus on:
-- Is this from an actual company or a job board/recruiting platform?
-- Does it contain specific interview scheduling details?
-- Is the language personalized or generic/mass-marketing?
-- Are there specific company names, roles, interview times mentioned?
-
-Respond ONLY with valid JSON, no other text.
-        """
+{numbered}
+        """.strip()
     
-    def _parse_ai_response(self, response_text: str) -> EmailClassification:
+    def _parse_ai_response(self, response_text: str, model_name: str) -> EmailClassification:
         """Parse AI response into EmailClassification object"""
         try:
-            # Clean up response text (remove markdown formatting if present)
-            clean_response = response_text.strip()
-            if clean_response.startswith('```json'):
-                clean_response = clean_response.replace('```json', '').replace('```', '').strip()
-            elif clean_response.startswith('```'):
-                clean_response = clean_response.replace('```', '').strip()
-            
-            # Parse JSON
-            result = json.loads(clean_response)
-            
-            return EmailClassification(
-                category=result.get('category', 'irrelevant'),
-                confidence=float(result.get('confidence', 0.5)),
-                reasoning=result.get('reasoning', 'AI classification'),
-                company=result.get('company'),
-                role=result.get('role'),
-                interview_scheduled=bool(result.get('interview_scheduled', False)),
-                status_suggestion=result.get('status_suggestion', 'applied')
-            )
+            return self._classification_from_dict(_json_loads(response_text), model_name)
             
         except json.JSONDecodeError as e:
-            print(f"Failed to parse AI response as JSON: {e}")
-            print(f"Response was: {response_text[:200]}...")
+            _log.warning("Failed to parse AI response as JSON: %s (response was: %.200s...)", e, response_text)
             return self._create_fallback_classification("AI parsing error")
         except Exception as e:
-            print(f"Error parsing AI response: {e}")
+            _log.warning("Error parsing AI response: %s", e)
             return self._create_fallback_classification("AI response error")
     
-    def _fallback_classification(self, email_data: Dict[str, Any]) -> EmailClassification:
+    def _parse_batch_response(self, response_text: str, expected: int,
+                              model_name: str) -> Optional[List[EmailClassification]]:
+        """Parse a batch AI response, returning None if it does not cover every email"""
+        try:
+            items = _json_loads(response_text).get('results', [])
+            if len(items) != expected:
+                return None
+            return [self._classification_from_dict(item, model_name) for item in items]
+        except Exception as e:
+            _log.warning("Failed to parse batch AI response: %s", e)
+            return None
+    
+    @staticmethod
+    def _classification_from_dict(result: Dict[str, Any], model_name: str) -> EmailClassification:
+        """Build an EmailClassification from a parsed JSON object"""
+        return EmailClassification(
+            category=result.get('category', 'irrelevant'),
+            confidence=float(result.get('confidence', 0.5)),
+            reasoning=result.get('reasoning', 'AI classification'),
+            company=result.get('company'),
+            role=result.get('role'),
+            interview_scheduled=bool(result.get('interview_scheduled', False)),
+            status_suggestion=result.get('status_suggestion', 'applied'),
+            model=model_name
+        )
+    
+    def _prefilter(self, email_data: EmailData) -> Optional[EmailClassification]:
+        """
+        Cheap rule-based triage run before any cache lookup or LLM call
+        
+        Returns:
+            EmailClassification for obviously promotional emails, or None if
+            the email needs the model
+        """
+        subject, from_email, body, snippet = _unpack_email(email_data)
+        domain = _sender_domain(from_email)
+        
+        if _domain_in(domain, ATS_DOMAINS):
+            return None
+        
+        if is_job_alert_sender(from_email):
+            return EmailClassification(
+                category='promotional',
+                confidence=0.95,
+                reasoning=f'Pre-filter: Sent by job alert address ({_sender_address(from_email)})',
+                status_suggestion='applied'
+            )
+        
+        full_content = f"{subject} {body or snippet}".lower()
+        promotional_hits = set(_PROMOTIONAL_RE.findall(full_content))
+        # Job boards also send application confirmations, so the domain alone isn't
+        # enough (and every job-board email has an unsubscribe footer)
+        if promotional_hits - {'unsubscribe'} and _domain_in(domain, JOB_BOARD_DOMAINS) and not _INTERVIEW_RE.search(full_content):
+            return EmailClassification(
+                category='promotional',
+                confidence=0.9,
+                reasoning=f'Pre-filter: Promotional mail from job board ({domain})',
+                status_suggestion='applied'
+            )
+        if len(promotional_hits) >= PREFILTER_MIN_PROMOTIONAL_HITS and not _INTERVIEW_RE.search(full_content):
+            return EmailClassification(
+                category='promotional',
+                confidence=0.9,
+                reasoning='Pre-filter: Multiple promotional keywords, no interview details',
+                status_suggestion='applied'
+            )
+        
+        return None
+    
+    def _fallback_classification(self, email_data: EmailData) -> EmailClassification:
         """Rule-based fallback classification when AI is not available"""
-        subject = email_data.get('subject', '').lower()
-        from_email = email_data.get('from', '').lower()
-        content = (email_data.get('body', '') or email_data.get('snippet', '')).lower()
+        subject, _, body, snippet = _unpack_email(email_data)
+        content = body or snippet
         
-        # Simple rule-based classification
-        full_content = f"{subject} {content}"
+        # Simple rule-based classification (lowercase the combined text once)
+        full_content = f"{subject} {content}".lower()
         
         # Check for obvious promotional indicators
-        promotional_indicators = [
-            'job alert', 'job recommendation', 'unsubscribe', 'click here to apply',
-            'thousands of jobs', 'job match', 'career newsletter', 'job digest'
-        ]
-        
-        if any(indicator in full_content for indicator in promotional_indicators):
+        if _PROMOTIONAL_RE.search(full_content):
             return EmailClassification(
                 category='promotional',
                 confidence=0.8,
@@ -207,12 +1025,7 @@ Respond ONLY with valid JSON, no other text.
             )
         
         # Check for interview scheduling
-        interview_indicators = [
-            'interview scheduled', 'interview confirmed', 'please join',
-            'zoom link', 'meeting link', 'interview invitation'
-        ]
-        
-        if any(indicator in full_content for indicator in interview_indicators):
+        if _INTERVIEW_RE.search(full_content):
             return EmailClassification(
                 category='job_interview',
                 confidence=0.7,
@@ -234,7 +1047,7 @@ Respond ONLY with valid JSON, no other text.
         return EmailClassification(
             category='irrelevant',
             confidence=0.3,
-            reasoning=f'Fallback classification: {reason}',
+            reasoning=f'{_FALLBACK_REASON_PREFIX}: {reason}',
             status_suggestion='applied'
         )
 
@@ -270,6 +1083,7 @@ def get_email_classifier() -> GeminiEmailClassifier:
     global _classifier_instance
     
     if _classifier_instance is None:
+        _load_env_once()
         api_key = os.getenv('GEMINI_API_KEY')
         
         if not api_key:
@@ -284,6 +1098,8 @@ def get_email_classifier() -> GeminiEmailClassifier:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(levelname)s %(name)s: %(message)s')
+    
     # Test the AI classifier
     print("🧪 Testing AI Email Classifier")
     print("=" * 40)
@@ -3,27 +3,34 @@ Job Application Tracker - Streamlit UI
 Main application interface for tracking job applications and interview emails.
 """
 
+import re
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import traceback
+from dataclasses import asdict
 from typing import List, Dict, Any
 
 # Import our utility modules
-from gmail_utils import get_gmail_service, fetch_interview_emails
+from gmail_utils import fetch_interview_emails
 from parser_utils import parse_interview_email
-from ai_email_classifier import GeminiEmailClassifier
+from ai_email_classifier import (
+    GeminiEmailClassifier, EmailClassification, CLASSIFICATION_SOURCES, classification_source
+)
 from db_utils import (
     init_db, 
     upsert_application, 
+    upsert_applications_bulk,
     list_applications, 
-    get_upcoming_interviews,
-    update_application_status,
-    delete_application,
-    get_application_stats,
-    search_applications
+    update_application_status_many,
+    delete_applications,
+    get_existing_msg_ids,
+    get_stored_classifications,
+    save_classifications
 )
 from init_demo_database import check_and_initialize_database
+from read_models import cached_board_data, cached_stats, cached_upcoming_interviews, invalidate_cached_reads
 
 # Import demo controller
 from demo_controller import get_demo_controller
@@ -47,13 +54,192 @@ from user_api_keys import (
     get_user_gemini_key
 )
 
+# Status keyword matchers for fetched emails (case-insensitive substring match)
+INTERVIEW_RE = re.compile(
+    r"interview scheduled|interview confirmed|interview invitation|please join|zoom link|"
+    r"meeting link|interview tomorrow|interview on|interview at|confirmed interview",
+    re.IGNORECASE
+)
+OFFER_RE = re.compile(r"congratulations|offer|selected|hired", re.IGNORECASE)
+REJECT_RE = re.compile(r"rejected|unfortunately|not selected|not moving forward", re.IGNORECASE)
+SCREEN_RE = re.compile(r"screening|phone screen|initial call", re.IGNORECASE)
+
+# Auto-refresh interval for the stats and upcoming interview panels
+SIDEBAR_REFRESH_SECONDS = 300
+
+# Times used when the manual entry form has a date but no time
+MIDNIGHT = datetime.min.time()
+NINE_AM = MIDNIGHT.replace(hour=9)
+
+# Default span of the date range filter on either side of today
+DATE_FILTER_WINDOW = timedelta(days=30)
+
+# Page sizes offered for the applications list
+PAGE_SIZE_OPTIONS = [10, 20, 50]
+
+# Application statuses, in pipeline order
+STATUS_OPTIONS = ["applied", "interview_scheduled", "interviewed", "rejected", "offer", "accepted"]
+
+# Columns shown in the applications table
+APP_TABLE_COLUMNS = ['id', 'company', 'role', 'status', 'date_applied', 'interview_date',
+                     'interview_round', 'email_subject', 'notes']
+
+# Actions offered for a selected Kanban card
+CARD_ACTIONS = {
+    'move': "➡️ Move to next stage",
+    'edit': "✏️ Edit details",
+    'view': "👁️ View details",
+}
+
+# Kanban HTML templates, filled with str.format per stage and card
+STAGE_HEADER_TEMPLATE = """
+<div style="
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 12px;
+    border-radius: 12px 12px 0 0;
+    text-align: center;
+    font-weight: bold;
+    margin-bottom: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+">
+    {name} ({count})
+</div>
+"""
+
+EMPTY_STAGE_TEMPLATE = """
+<div style="
+    padding: 24px;
+    text-align: center;
+    color: #999;
+    border: 2px dashed #ddd;
+    border-radius: 12px;
+    margin: 8px 0;
+    background: #fafafa;
+">
+    <p style="margin: 0; font-style: italic;">
+        No applications<br>in {name}
+    </p>
+</div>
+"""
+
+CARD_TEMPLATE = """
+<div style="
+    border: 2px solid {border_color};
+    border-radius: 8px;
+    padding: 12px;
+    margin: 8px 0;
+    background-color: {card_color};
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <h5 style="margin: 0; color: #333;">
+            {company}
+        </h5>
+        <small style="color: #666;">#{app_id}</small>
+    </div>
+    <p style="margin: 4px 0 8px 0; color: #555; font-size: 13px;">
+        {role}
+    </p>
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <small style="color: #888;">
+            📅 {date_applied}
+        </small>
+        <small style="color: #888;">
+            ⏱️ {days_in_stage}d
+        </small>
+    </div>
+</div>
+"""
+
+def _keyword_statuses(parsed_emails: List[Dict[str, Any]]) -> List[str]:
+    """Keyword-rule status for each parsed email ('' where no rule matches)"""
+    if not parsed_emails:
+        return []
+    
+    emails_df = pd.DataFrame({
+        'content': [f"{parsed['subject']} {parsed['body']}" for parsed in parsed_emails],
+        'has_dates': [bool(parsed['interview_dates']) for parsed in parsed_emails],
+    })
+    content = emails_df['content']
+    
+    # First matching rule wins, as in an if/elif chain
+    conditions = [
+        emails_df['has_dates'] & content.str.contains(INTERVIEW_RE),
+        content.str.contains(OFFER_RE),
+        content.str.contains(REJECT_RE),
+        content.str.contains(SCREEN_RE),
+    ]
+    choices = ['interview_scheduled', 'offer', 'rejected', 'interview_scheduled']
+    return np.select(conditions, choices, default='').tolist()
+
+
+def _change_page(step: int):
+    """Move the applications list by one page (button callback)"""
+    st.session_state.page = max(st.session_state.get('page', 0) + step, 0)
+
+
+@st.fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+def render_quick_stats():
+    """Sidebar statistics; refreshes on its own timer"""
+    try:
+        stats = cached_stats()
+        st.metric("Total Applications", stats.get('total_applications', 0))
+        st.metric("Upcoming Interviews", stats.get('upcoming_interviews', 0))
+        
+        # Status breakdown
+        if stats.get('by_status'):
+            st.write("**By Status:**")
+            for status, count in stats['by_status'].items():
+                st.write(f"• {status.replace('_', ' ').title()}: {count}")
+                
+    except Exception as e:
+        st.error(f"Error loading stats: {e}")
+
+
+@st.fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+def render_upcoming_interviews():
+    """Interviews in the next 7 days; refreshes on its own timer"""
+    try:
+        upcoming_interviews = cached_upcoming_interviews(days_ahead=7)
+        
+        if not upcoming_interviews.empty:
+            st.warning("🚨 **Upcoming Interviews (Next 7 Days)**")
+            
+            # Format dates once for the whole frame instead of per row
+            upcoming_interviews['interview_date_str'] = (
+                upcoming_interviews['interview_date'].dt.strftime('%B %d, %Y at %I:%M %p').fillna('')
+            )
+            
+            for interview in upcoming_interviews.to_dict('records'):
+                with st.container():
+                    col_a, col_b, col_c = st.columns([2, 2, 1])
+                    with col_a:
+                        st.write(f"**{interview['company']}** - {interview['role']}")
+                    with col_b:
+                        if interview['interview_date_str']:
+                            st.write(f"📅 {interview['interview_date_str']}")
+                        else:
+                            st.write("📅 Invalid date")
+                    with col_c:
+                        st.write(f"🎯 {interview.get('interview_round', 'Unknown')}")
+                    
+                    if interview.get('notes'):
+                        st.caption(f"📝 {interview['notes']}")
+                    
+                    st.markdown("---")
+    except Exception as e:
+        st.error(f"Error loading upcoming interviews: {e}")
+
+
 # Kanban board functions - defined early to avoid NameError
+@st.fragment
 def main_kanban_view():
     """Kanban board view for visual pipeline management"""
     
     try:
         # Import Kanban functionality
-        from kanban_database import get_board_data, move_application_to_stage, BOARD_STAGES
+        from kanban_database import BOARD_STAGES, ACTIVE_STAGES
         
         st.markdown("### 🎯 Visual Pipeline - Drag & Drop Job Applications")
         st.info("💡 **Interactive Board**: Click the buttons below each application card to move between stages, add notes, or view details.")
@@ -67,6 +253,8 @@ def main_kanban_view():
         
         with col2:
             if st.button("🔄 Refresh Board", help="Reload the board data"):
+                invalidate_cached_reads()
+                # Full rerun so the sidebar stats pick up the reloaded data too
                 st.rerun()
         
         with col3:
@@ -76,7 +264,7 @@ def main_kanban_view():
         st.markdown("---")
         
         # Get board data
-        board_data = get_board_data()
+        board_data = cached_board_data()
         
         # Create columns for each stage
         columns = st.columns(len(BOARD_STAGES))
@@ -88,49 +276,32 @@ def main_kanban_view():
                 stage_apps = board_data.get(stage_key, [])
                 app_count = len(stage_apps)
                 
-                st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 12px;
-                    border-radius: 12px 12px 0 0;
-                    text-align: center;
-                    font-weight: bold;
-                    margin-bottom: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-                ">
-                    {stage_info['name']} ({app_count})
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(
+                    STAGE_HEADER_TEMPLATE.format(name=stage_info['name'], count=app_count),
+                    unsafe_allow_html=True
+                )
                 
                 # Applications in this stage
                 if stage_apps:
-                    for app in stage_apps:
-                        create_simple_kanban_card(app, stage_key)
+                    # One markdown element for every card in the column
+                    st.markdown(
+                        ''.join(create_simple_kanban_card(app) for app in stage_apps),
+                        unsafe_allow_html=True
+                    )
+                    render_stage_actions(stage_apps, stage_key)
                 else:
                     # Empty stage placeholder
-                    st.markdown(f"""
-                    <div style="
-                        padding: 24px;
-                        text-align: center;
-                        color: #999;
-                        border: 2px dashed #ddd;
-                        border-radius: 12px;
-                        margin: 8px 0;
-                        background: #fafafa;
-                    ">
-                        <p style="margin: 0; font-style: italic;">
-                            No applications<br>in {stage_info['name'].lower()}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(
+                        EMPTY_STAGE_TEMPLATE.format(name=stage_info['name'].lower()),
+                        unsafe_allow_html=True
+                    )
         
         # Board analytics summary
         st.markdown("---")
         col1, col2, col3, col4 = st.columns(4)
         
         total_apps = sum(len(apps) for apps in board_data.values())
-        active_apps = sum(len(board_data.get(stage, [])) for stage in ['applied', 'screening', 'interview', 'final'])
+        active_apps = sum(len(board_data.get(stage, [])) for stage in ACTIVE_STAGES)
         closed_apps = len(board_data.get('closed', []))
         
         with col1:
@@ -147,8 +318,8 @@ def main_kanban_view():
         st.error(f"Error loading Kanban board: {e}")
         st.info("💡 Make sure the database has been upgraded for Kanban functionality.")
 
-def create_simple_kanban_card(app, stage):
-    """Create a simplified Kanban card for the integrated view"""
+def create_simple_kanban_card(app):
+    """Build the HTML for a simplified Kanban card in the integrated view"""
     
     # Calculate days in current stage
     import datetime
@@ -174,64 +345,61 @@ def create_simple_kanban_card(app, stage):
         card_color = "#f5f5f5"
         border_color = "#9e9e9e"
     
-    # Create the card
-    with st.container():
-        st.markdown(f"""
-        <div style="
-            border: 2px solid {border_color}; 
-            border-radius: 8px; 
-            padding: 12px; 
-            margin: 8px 0; 
-            background-color: {card_color};
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        ">
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <h5 style="margin: 0; color: #333;">
-                    {app.get('company', 'Unknown')}
-                </h5>
-                <small style="color: #666;">#{app.get('id', '000')}</small>
-            </div>
-            <p style="margin: 4px 0 8px 0; color: #555; font-size: 13px;">
-                {app.get('role', 'Unknown Role')[:30]}{'...' if len(str(app.get('role', ''))) > 30 else ''}
-            </p>
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <small style="color: #888;">
-                    📅 {app.get('date_applied', 'Unknown')[:10] if app.get('date_applied') else 'Unknown'}
-                </small>
-                <small style="color: #888;">
-                    ⏱️ {days_in_stage}d
-                </small>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Simple action buttons
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("➡️", key=f"simple_move_{app['id']}", help="Move to next stage"):
-                move_to_next_stage_simple(app, stage)
-        
-        with col2:
-            if st.button("✏️", key=f"simple_edit_{app['id']}", help="Edit details"):
-                st.info(f"Editing {app['company']} - use the main list view for detailed editing")
-        
-        with col3:
-            if st.button("👁️", key=f"simple_view_{app['id']}", help="View details"):
-                show_simple_app_details(app)
+    role = str(app.get('role') or 'Unknown Role')
+    date_applied = app.get('date_applied')
+    
+    return CARD_TEMPLATE.format(
+        border_color=border_color,
+        card_color=card_color,
+        company=app.get('company', 'Unknown'),
+        app_id=app.get('id', '000'),
+        role=role[:30] + ('...' if len(role) > 30 else ''),
+        date_applied=date_applied[:10] if date_applied else 'Unknown',
+        days_in_stage=days_in_stage
+    )
+
+def render_stage_actions(stage_apps, stage):
+    """Action menu for a whole stage column, submitted as a single form"""
+    
+    with st.form(f"stage_actions_{stage}", border=False):
+        selected_app = st.selectbox(
+            "Application",
+            stage_apps,
+            format_func=lambda app: f"{app.get('company', 'Unknown')} #{app['id']}",
+            key=f"stage_app_{stage}",
+            label_visibility="collapsed"
+        )
+        
+        action = st.selectbox(
+            "Action",
+            list(CARD_ACTIONS),
+            format_func=CARD_ACTIONS.get,
+            key=f"stage_action_{stage}",
+            label_visibility="collapsed"
+        )
+        submitted = st.form_submit_button("Go", use_container_width=True)
+    
+    if not submitted:
+        return
+    
+    if action == 'move':
+        move_to_next_stage_simple(selected_app, stage)
+    elif action == 'edit':
+        st.info(f"Editing {selected_app['company']} - use the main list view for detailed editing")
+    elif action == 'view':
+        show_simple_app_details(selected_app)
 
 def move_to_next_stage_simple(app, current_stage):
     """Simplified stage movement for integrated view"""
-    from kanban_database import move_application_to_stage
-    
-    stage_order = ['backlog', 'applied', 'screening', 'interview', 'final', 'closed']
+    from kanban_database import move_application_to_stage, NEXT_STAGE
     
     try:
-        current_idx = stage_order.index(current_stage)
-        if current_idx < len(stage_order) - 1:
-            next_stage = stage_order[current_idx + 1]
+        next_stage = NEXT_STAGE.get(current_stage)
+        if next_stage:
             move_application_to_stage(app['id'], next_stage, f"Moved via Kanban board")
+            invalidate_cached_reads()
             st.success(f"✅ Moved {app['company']} forward!")
+            # Full rerun: the sidebar fragments read the data this write changed
             st.rerun()
         else:
             st.warning("Application is in the final stage")
@@ -375,8 +543,9 @@ with st.sidebar:
             
         with st.spinner("Fetching emails from Gmail..."):
             try:
-                # Get Gmail service
-                service = get_gmail_service()
+                # Get Gmail service (built once per session)
+                from session_gmail import get_cached_gmail_service, fetch_session_emails_batch
+                service = get_cached_gmail_service()
                 
                 # Initialize AI classifier with user's API key
                 ai_classifier = create_configured_gemini_classifier()
@@ -384,22 +553,54 @@ with st.sidebar:
                     st.error("❌ Failed to initialize Gemini classifier. Check your API key.")
                     st.stop()
                 
-                # Fetch interview emails using session-based Gmail
-                from session_gmail import fetch_session_emails
-                emails = fetch_session_emails(max_results=50)
+                # Fetch interview emails using session-based Gmail (batched message fetch)
+                emails = fetch_session_emails_batch(max_results=50, service=service)
                 
                 if emails:
                     st.success(f"Found {len(emails)} interview emails!")
                     
-                    # Parse and store emails
-                    processed_count = 0
+                    # Messages already stored as applications were handled by an earlier fetch
+                    known_ids = get_existing_msg_ids([email['message_id'] for email in emails])
+                    emails = [email for email in emails if email['message_id'] not in known_ids]
+                    
+                    # Reuse classifications saved by earlier fetches; only unseen messages go to Gemini
+                    stored_classifications = get_stored_classifications(
+                        [email['message_id'] for email in emails], CLASSIFICATION_SOURCES
+                    )
+                    unclassified = [email for email in emails if email['message_id'] not in stored_classifications]
+                    
+                    # Gemini classifies the unseen emails, several per prompt
+                    new_results = dict(zip(
+                        [email['message_id'] for email in unclassified],
+                        ai_classifier.classify_emails(unclassified)
+                    ))
+                    
+                    # Parse inline: it's CPU-bound regex/dateparser work, so threads wouldn't overlap it
+                    parsed_emails = []
                     for email in emails:
                         try:
-                            # Parse email content
-                            parsed_data = parse_interview_email(email)
-                            
+                            parsed_emails.append((email, parse_interview_email(email)))
+                        except Exception as e:
+                            st.error(f"Error processing email: {e}")
+                    
+                    # Keyword status rules evaluated over the whole batch at once
+                    keyword_statuses = _keyword_statuses([parsed_data for _, parsed_data in parsed_emails])
+                    
+                    # Collect records to store
+                    records = []
+                    new_classifications = {}
+                    for (email, parsed_data), keyword_status in zip(parsed_emails, keyword_statuses):
+                        try:
                             # Use AI-powered email classification
-                            ai_classification = ai_classifier.classify_email(email)
+                            msg_id = email['message_id']
+                            if msg_id in stored_classifications:
+                                ai_classification = EmailClassification(**stored_classifications[msg_id])
+                            else:
+                                ai_classification = new_results[msg_id]
+                                # Only model output is kept; rule and semantic-cache results are redone
+                                source = classification_source(ai_classification)
+                                if source:
+                                    new_classifications[msg_id] = {**asdict(ai_classification), 'model': source}
                             
                             if ai_classification.category == 'promotional':
                                 print(f"Skipping promotional email: {parsed_data['subject'][:50]}...")
@@ -411,29 +612,8 @@ with st.sidebar:
                             # Log what we're processing
                             print(f"Processing {ai_classification.category} email: {parsed_data['company']} - {parsed_data['role']}")
                             
-                            # Use AI suggestion for status, with fallback to hardcoded logic
-                            status = ai_classification.status_suggestion if ai_classification.status_suggestion else 'applied'
-                            email_content_lower = f"{parsed_data['subject']} {parsed_data['body']}".lower()
-                            
-                            # Check for actual interview scheduling keywords
-                            if any(keyword in email_content_lower for keyword in [
-                                'interview scheduled', 'interview confirmed', 'interview invitation',
-                                'please join', 'zoom link', 'meeting link', 'interview tomorrow',
-                                'interview on', 'interview at', 'confirmed interview'
-                            ]) and parsed_data['interview_dates']:
-                                status = 'interview_scheduled'
-                            elif any(keyword in email_content_lower for keyword in [
-                                'congratulations', 'offer', 'selected', 'hired'
-                            ]):
-                                status = 'offer'
-                            elif any(keyword in email_content_lower for keyword in [
-                                'rejected', 'unfortunately', 'not selected', 'not moving forward'
-                            ]):
-                                status = 'rejected'
-                            elif any(keyword in email_content_lower for keyword in [
-                                'screening', 'phone screen', 'initial call'
-                            ]):
-                                status = 'interview_scheduled'
+                            # Keyword rules take precedence, then the AI suggestion
+                            status = keyword_status or ai_classification.status_suggestion or 'applied'
                             
                             # Prepare database record - prefer AI-extracted data when available
                             record = {
@@ -453,14 +633,18 @@ with st.sidebar:
                                 record['interview_date'] = parsed_data['interview_dates'][0]
                                 record['interview_round'] = 'unknown'
                             
-                            # Store in database
-                            upsert_application(record)
-                            processed_count += 1
+                            # Collect for a single bulk write after the loop
+                            records.append(record)
                             
                         except Exception as e:
                             st.error(f"Error processing email: {e}")
                             continue
                     
+                    # Store in database (one transaction for the whole fetch)
+                    save_classifications(new_classifications)
+                    processed_count = len(upsert_applications_bulk(records))
+                    if processed_count:
+                        invalidate_cached_reads()
                     st.success(f"Processed {processed_count} emails successfully!")
                     st.rerun()  # Refresh the app to show new data
                     
@@ -489,10 +673,7 @@ with st.sidebar:
         with col1:
             date_applied = st.date_input("Date Applied", value=datetime.now().date())
         with col2:
-            status = st.selectbox("Status", [
-                "applied", "interview_scheduled", "interviewed", 
-                "rejected", "offer", "accepted"
-            ])
+            status = st.selectbox("Status", STATUS_OPTIONS)
         
         # Interview date and time inputs
         col_date, col_time = st.columns(2)
@@ -515,7 +696,7 @@ with st.sidebar:
                     'company': company,
                     'role': role,
                     'source': 'manual',
-                    'date_applied': datetime.combine(date_applied, datetime.min.time()),
+                    'date_applied': datetime.combine(date_applied, MIDNIGHT) if date_applied else None,
                     'status': status,
                     'notes': notes
                 }
@@ -526,12 +707,13 @@ with st.sidebar:
                         record['interview_date'] = datetime.combine(interview_date, interview_time)
                     else:
                         # Use date with default time (9:00 AM)
-                        record['interview_date'] = datetime.combine(interview_date, datetime.min.time().replace(hour=9))
+                        record['interview_date'] = datetime.combine(interview_date, NINE_AM)
                 if interview_round:
                     record['interview_round'] = interview_round
                 
                 try:
                     app_id = upsert_application(record)
+                    invalidate_cached_reads()
                     st.success(f"Added application (ID: {app_id})")
                     st.rerun()
                 except Exception as e:
@@ -543,19 +725,7 @@ with st.sidebar:
     
     # Statistics
     st.subheader("📊 Quick Stats")
-    try:
-        stats = get_application_stats()
-        st.metric("Total Applications", stats.get('total_applications', 0))
-        st.metric("Upcoming Interviews", stats.get('upcoming_interviews', 0))
-        
-        # Status breakdown
-        if stats.get('by_status'):
-            st.write("**By Status:**")
-            for status, count in stats['by_status'].items():
-                st.write(f"• {status.replace('_', ' ').title()}: {count}")
-                
-    except Exception as e:
-        st.error(f"Error loading stats: {e}")
+    render_quick_stats()
 
 # Main content area
 col1, col2 = st.columns([3, 1])
@@ -567,131 +737,108 @@ with col2:
     search_query = st.text_input("Search applications", placeholder="Company, role, or notes...")
     
     # Status filter
-    status_filter = st.multiselect("Filter by Status", [
-        "applied", "interview_scheduled", "interviewed", 
-        "rejected", "offer", "accepted"
-    ])
+    status_filter = st.multiselect("Filter by Status", STATUS_OPTIONS)
     
     # Date range filter
     st.write("Date Range:")
-    date_from = st.date_input("From", value=datetime.now().date() - timedelta(days=30))
-    date_to = st.date_input("To", value=datetime.now().date() + timedelta(days=30))
+    if 'date_filter_defaults' not in st.session_state:
+        today = datetime.now().date()
+        st.session_state.date_filter_defaults = (today - DATE_FILTER_WINDOW, today + DATE_FILTER_WINDOW)
+    default_from, default_to = st.session_state.date_filter_defaults
+    date_from = st.date_input("From", value=default_from)
+    date_to = st.date_input("To", value=default_to)
 
 with col1:
     # Main applications view
     st.subheader("📋 Applications")
     
     # Upcoming interviews section
-    try:
-        upcoming_interviews = get_upcoming_interviews(days_ahead=7)
-        
-        if not upcoming_interviews.empty:
-            st.warning("🚨 **Upcoming Interviews (Next 7 Days)**")
-            
-            for _, interview in upcoming_interviews.iterrows():
-                with st.container():
-                    col_a, col_b, col_c = st.columns([2, 2, 1])
-                    with col_a:
-                        st.write(f"**{interview['company']}** - {interview['role']}")
-                    with col_b:
-                        interview_dt = pd.to_datetime(interview['interview_date'], format='mixed', errors='coerce')
-                        if pd.notna(interview_dt):
-                            st.write(f"📅 {interview_dt.strftime('%B %d, %Y at %I:%M %p')}")
-                        else:
-                            st.write("📅 Invalid date")
-                    with col_c:
-                        st.write(f"🎯 {interview.get('interview_round', 'Unknown')}")
-                    
-                    if interview.get('notes'):
-                        st.caption(f"📝 {interview['notes']}")
-                    
-                    st.markdown("---")
-    except Exception as e:
-        st.error(f"Error loading upcoming interviews: {e}")
+    render_upcoming_interviews()
 
     # Applications table
     try:
-        # Load applications
-        if search_query:
-            df = search_applications(search_query)
-        else:
-            df = list_applications()
-        
-        # Apply filters
-        if status_filter:
-            df = df[df['status'].isin(status_filter)]
+        # Load applications with all filters applied in SQL
+        df = list_applications(
+            status_in=status_filter,
+            date_from=date_from,
+            date_to=date_to,
+            search=search_query
+        )
         
-        # Date filter (assuming date_applied column exists)
-        if 'date_applied' in df.columns and not df.empty and len(df) > 0:
-            # Convert to datetime and handle NaT values
-            df['date_applied'] = pd.to_datetime(df['date_applied'], errors='coerce')
+        if not df.empty:
+            # Paginate so the widget count stays bounded regardless of table size
+            page_col, size_col = st.columns([3, 1])
+            with size_col:
+                page_size = st.selectbox("Per page", PAGE_SIZE_OPTIONS, index=1, key="page_size")
             
-            # Create date range as datetime objects for proper comparison
-            date_from_dt = pd.to_datetime(date_from)
-            date_to_dt = pd.to_datetime(date_to) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)  # Include end of day
+            page_count = (len(df) - 1) // page_size + 1
+            page = min(st.session_state.get('page', 0), page_count - 1)
+            st.session_state.page = page
             
-            # Filter by date range, handling NaT values (keep rows where date_applied is not null)
-            mask = (df['date_applied'].notna()) & (df['date_applied'] >= date_from_dt) & (df['date_applied'] <= date_to_dt)
-            df = df[mask]
-        
-        if not df.empty:
-            st.write(f"**Showing {len(df)} applications**")
+            with page_col:
+                start = page * page_size
+                st.write(f"**Showing {start + 1}-{min(start + page_size, len(df))} of {len(df)} applications**")
             
-            # Display applications
-            for idx, app in df.iterrows():
-                with st.expander(f"**{app.get('company', 'Unknown')}** - {app.get('role', 'Unknown Role')} ({app.get('status', 'unknown').replace('_', ' ').title()})"):
-                    
-                    col_info, col_actions = st.columns([3, 1])
-                    
-                    with col_info:
-                        # Application details
-                        if app.get('date_applied'):
-                            date_applied = pd.to_datetime(app['date_applied'], errors='coerce')
-                            if pd.notna(date_applied):
-                                st.write(f"📅 **Applied:** {date_applied.strftime('%B %d, %Y')}")
-                        
-                        if app.get('interview_date'):
-                            interview_dt = pd.to_datetime(app['interview_date'], format='mixed', errors='coerce')
-                            if pd.notna(interview_dt):
-                                st.write(f"🎯 **Interview:** {interview_dt.strftime('%B %d, %Y at %I:%M %p')}")
-                            else:
-                                st.write("🎯 **Interview:** Invalid date")
-                            
-                            if app.get('interview_round'):
-                                st.write(f"**Round:** {app['interview_round'].replace('_', ' ').title()}")
-                        
-                        if app.get('source') == 'gmail':
-                            st.write(f"📧 **From:** {app.get('email_from', 'Unknown')}")
-                            if app.get('email_subject'):
-                                st.write(f"**Subject:** {app['email_subject']}")
-                        
-                        if app.get('notes'):
-                            st.write(f"📝 **Notes:** {app['notes']}")
-                    
-                    with col_actions:
-                        # Action buttons
-                        new_status = st.selectbox(
-                            "Update Status",
-                            ["applied", "interview_scheduled", "interviewed", "rejected", "offer", "accepted"],
-                            index=["applied", "interview_scheduled", "interviewed", "rejected", "offer", "accepted"].index(app.get('status', 'applied')),
-                            key=f"status_{app['id']}"
-                        )
-                        
-                        if st.button("Update", key=f"update_{app['id']}"):
-                            try:
-                                update_application_status(app['id'], new_status)
-                                st.success("Updated!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error: {e}")
-                        
-                        if st.button("🗑️ Delete", key=f"delete_{app['id']}"):
-                            try:
-                                delete_application(app['id'])
-                                st.success("Deleted!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+            # One editable table for the visible slice instead of an expander per row
+            page_df = df.iloc[start:start + page_size][APP_TABLE_COLUMNS].copy()
+            page_df['delete'] = False
+            editor_key = f"apps_editor_{page}_{page_size}"
+            
+            edited_df = st.data_editor(
+                page_df,
+                column_config={
+                    'id': None,  # Hidden, used to map edits back to rows
+                    'company': st.column_config.TextColumn("Company"),
+                    'role': st.column_config.TextColumn("Role"),
+                    'status': st.column_config.SelectboxColumn("Status", options=STATUS_OPTIONS, required=True),
+                    'date_applied': st.column_config.DatetimeColumn("Applied", format="MMM D, YYYY"),
+                    'interview_date': st.column_config.DatetimeColumn("Interview", format="MMM D, YYYY h:mm a"),
+                    'interview_round': st.column_config.TextColumn("Round"),
+                    'email_subject': st.column_config.TextColumn("Email Subject"),
+                    'notes': st.column_config.TextColumn("Notes"),
+                    'delete': st.column_config.CheckboxColumn("🗑️ Delete"),
+                },
+                disabled=[column for column in APP_TABLE_COLUMNS if column != 'status'],
+                hide_index=True,
+                num_rows="fixed",
+                use_container_width=True,
+                key=editor_key
+            )
+            
+            # Diff the edited table against what was shown
+            status_changes = edited_df['status'] != page_df['status']
+            status_by_id = dict(zip(
+                edited_df.loc[status_changes, 'id'].tolist(),
+                edited_df.loc[status_changes, 'status'].tolist()
+            ))
+            delete_ids = edited_df.loc[edited_df['delete'], 'id'].tolist()
+            
+            if st.button("💾 Save Changes", disabled=not (status_by_id or delete_ids), key="apps_save"):
+                try:
+                    # Rows marked for deletion don't need their status saved first
+                    for app_id in delete_ids:
+                        status_by_id.pop(app_id, None)
+                    update_application_status_many(
+                        [(app_id, status, None) for app_id, status in status_by_id.items()]
+                    )
+                    delete_applications(delete_ids)
+                    invalidate_cached_reads()
+                    # Drop the pending edits so they aren't replayed onto the reloaded rows
+                    del st.session_state[editor_key]
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error: {e}")
+            
+            if page_count > 1:
+                prev_col, info_col, next_col = st.columns([1, 2, 1])
+                with prev_col:
+                    st.button("⬅️ Previous", disabled=page == 0,
+                              on_click=_change_page, args=(-1,), key="page_prev")
+                with info_col:
+                    st.caption(f"Page {page + 1} of {page_count}")
+                with next_col:
+                    st.button("Next ➡️", disabled=page >= page_count - 1,
+                              on_click=_change_page, args=(1,), key="page_next")
         else:
             st.info("No applications found. Try fetching from Gmail or adding manually!")
             
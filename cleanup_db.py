@@ -12,6 +12,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from db_utils import get_db_connection
 
+# Rows deleted in one cleanup before it's worth rebuilding the file with VACUUM
+VACUUM_MIN_DELETED = 500
+
 def cleanup_database():
     """Clean up inaccurate job application entries"""
     print("🧹 Starting database cleanup...")
@@ -20,6 +23,9 @@ def cleanup_database():
     cursor = conn.cursor()
     
     try:
+        # Hold the write lock for the whole cleanup; one commit at the end
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # 1. Delete entries from promotional/spam sources
         spam_companies = [
             'Naukri', 'Shine', 'Monster', 'Indeed', 'LinkedIn', 'Calendly',
@@ -27,9 +33,12 @@ def cleanup_database():
             'Glassdoor', 'Angelco', 'Instahyre', 'Cutshort', 'Jobs.Shine'
         ]
         
-        placeholders = ','.join(['?' for _ in spam_companies])
-        delete_query = f"DELETE FROM applications WHERE company IN ({placeholders})"
-        cursor.execute(delete_query, spam_companies)
+        # Blocklist goes into a temp table so the DELETE needs no per-name placeholders
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS spam_companies (name TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM spam_companies")
+        cursor.executemany("INSERT OR IGNORE INTO spam_companies (name) VALUES (?)",
+                           [(company,) for company in spam_companies])
+        cursor.execute("DELETE FROM applications WHERE company IN (SELECT name FROM spam_companies)")
         deleted_spam = cursor.rowcount
         print(f"📧 Deleted {deleted_spam} promotional/spam entries")
         
@@ -74,6 +83,16 @@ def cleanup_database():
                 print(f"  Subject: {subject[:60]}...")
         
         conn.commit()
+        
+        # Refresh planner statistics so the partial indexes get picked up
+        cursor.execute("ANALYZE applications")
+        cursor.execute("PRAGMA optimize")
+        
+        # Give freed pages back to the filesystem after a large purge
+        # (VACUUM can't run inside a transaction, so this comes after the commit)
+        if deleted_spam + deleted_incomplete >= VACUUM_MIN_DELETED:
+            cursor.execute("VACUUM")
+            print(f"🗜️ Vacuumed database after removing {deleted_spam + deleted_incomplete} entries")
         print("\n🎉 Database cleanup successful!")
         
     except Exception as e:
@@ -3,10 +3,19 @@ Compare AI Classification vs Old Hardcoded Rules
 Demonstrates the improvement of AI-powered email classification over rule-based approach.
 """
 
-from ai_email_classifier import GeminiEmailClassifier
+import asyncio
+
+from ai_email_classifier import GeminiEmailClassifier, is_job_alert_sender
 from smart_spam_detection import classify_email, is_job_board_spam
 from parser_utils import parse_interview_email
 
+async def _classify_concurrently(ai_classifier, emails):
+    """Classify emails with overlapping AI calls, then release the HTTP session"""
+    try:
+        return await asyncio.gather(*(ai_classifier.classify_email_async(email) for email in emails))
+    finally:
+        await ai_classifier.aclose()
+
 def compare_classification_approaches():
     """Compare AI vs rule-based classification on sample emails"""
     
@@ -62,6 +71,25 @@ StartupAI'''
         }
     ]
     
+    # Stage 1: job-alert senders are promotional; skip parsing and the AI call
+    to_classify = [email for email in test_emails if not is_job_alert_sender(email['from'])]
+    
+    # Rule-based pass over the survivors (cheap, local)
+    parsed = [parse_interview_email(email) for email in to_classify]
+    old_results = [
+        (classify_email(email, parsed_data),
+         is_job_board_spam(parsed_data.get('company', ''), email.get('from', '')))
+        for email, parsed_data in zip(to_classify, parsed)
+    ]
+    
+    # Stage 2: all AI calls in flight at once instead of one round trip each
+    ai_results = asyncio.run(_classify_concurrently(ai_classifier, to_classify))
+    
+    results = {
+        id(email): (parsed_data, old_result, ai_result)
+        for email, parsed_data, old_result, ai_result in zip(to_classify, parsed, old_results, ai_results)
+    }
+    
     print("\n" + "="*80)
     print("📊 CLASSIFICATION COMPARISON")
     print("="*80)
@@ -72,13 +100,12 @@ StartupAI'''
         print(f"From: {email['from']}")
         print(f"Body preview: {email['body'][:100]}...")
         
-        # Old approach - parse then classify
-        parsed_data = parse_interview_email(email)
-        old_classification = classify_email(email, parsed_data)
-        is_spam = is_job_board_spam(parsed_data.get('company', ''), email.get('from', ''))
+        if id(email) not in results:
+            print("\n⚡ PRE-FILTER: Job alert sender, classified as promotional without parsing or AI")
+            print("-" * 50)
+            continue
         
-        # New AI approach
-        ai_result = ai_classifier.classify_email(email)
+        parsed_data, (old_classification, is_spam), ai_result = results[id(email)]
         
         print(f"\n🔧 OLD RULE-BASED APPROACH:")
         print(f"   Classification: {old_classification}")
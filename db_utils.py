@@ -3,74 +3,339 @@ Database utilities for SQLite operations in job application tracker.
 Handles database initialization, CRUD operations, and data management.
 """
 
+import atexit
+import re
 import sqlite3
+import threading
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 import json
 
 
 DATABASE_PATH = 'jobs.db'
 
+ONE_DAY = timedelta(days=1)
+
+# Bytes of the database file SQLite may memory-map for reads
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Page cache per connection, in KiB (passed to SQLite as a negative cache_size)
+CACHE_SIZE_KIB = 64 * 1024
+
+# Prepared statements kept per connection by the sqlite3 module
+STATEMENT_CACHE_SIZE = 128
+
+# Per-thread connections handed out by _get_conn()
+_thread_local = threading.local()
+
+# Database paths that run PRAGMA optimize when the process exits
+_optimize_on_exit_paths = set()
+
+# Columns written by _INSERT_SQL/_UPSERT_SQL, in a fixed order so the statements are cached
+APPLICATION_COLUMNS = (
+    'msg_id', 'company', 'role', 'source', 'date_applied', 'status',
+    'interview_date', 'interview_round', 'notes', 'snippet',
+    'email_subject', 'email_from'
+)
+
+# Values used on insert when a record leaves these columns out
+_INSERT_DEFAULTS = {'source': "'manual'", 'status': "'applied'"}
+
+_INSERT_SQL = f'''
+    INSERT INTO applications ({', '.join(APPLICATION_COLUMNS)}, updated_at)
+    VALUES ({', '.join(
+        f"COALESCE(:{column}, {_INSERT_DEFAULTS[column]})" if column in _INSERT_DEFAULTS else f":{column}"
+        for column in APPLICATION_COLUMNS
+    )}, CURRENT_TIMESTAMP)
+'''
+
+# Insert-or-update keyed on msg_id; a missing (None) value keeps the stored one
+_UPSERT_SQL = _INSERT_SQL + f'''
+    ON CONFLICT(msg_id) DO UPDATE SET
+        {', '.join(f"{column} = COALESCE(:{column}, {column})" for column in APPLICATION_COLUMNS if column != 'msg_id')},
+        updated_at = CURRENT_TIMESTAMP
+'''
+_UPSERT_RETURNING_SQL = _UPSERT_SQL + 'RETURNING id'
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lists
+SQL_PARAM_CHUNK = 500
+
+# Columns returned by list_application_rows / search_application_rows
+LIST_COLUMNS = (
+    'id', 'company', 'role', 'source', 'date_applied', 'status',
+    'interview_date', 'interview_round', 'notes', 'email_subject',
+    'email_from', 'created_at', 'updated_at'
+)
+
+# Columns returned by get_upcoming_interview_rows
+UPCOMING_COLUMNS = (
+    'id', 'company', 'role', 'interview_date', 'interview_round',
+    'notes', 'email_subject', 'status'
+)
+
+# Text columns mirrored into the applications_fts full-text index
+FTS_COLUMNS = ('company', 'role', 'notes', 'email_subject')
+
+# Columns a plain search covers (search_applications field='all')
+SEARCH_COLUMNS = ('company', 'role', 'notes')
+
+# Full-text search: index probe on applications_fts, best matches first
+_SEARCH_FTS_SQL = f'''
+    SELECT {', '.join(f'a.{column}' for column in LIST_COLUMNS)}
+    FROM applications_fts
+    JOIN applications a ON a.id = applications_fts.rowid
+    WHERE applications_fts MATCH :match
+    ORDER BY rank
+    LIMIT :lim
+'''
+
+# LIKE fallback; the field is masked in SQL rather than formatted in, so one
+# cached statement serves every field
+_SEARCH_LIKE_SQL = f'''
+    SELECT {', '.join(LIST_COLUMNS)} FROM applications
+    WHERE ((:field = 'all' OR :field = 'company') AND company LIKE :pattern)
+       OR ((:field = 'all' OR :field = 'role') AND role LIKE :pattern)
+       OR ((:field = 'all' OR :field = 'notes') AND notes LIKE :pattern)
+       OR (:field = 'email_subject' AND email_subject LIKE :pattern)
+    ORDER BY updated_at DESC
+    LIMIT :lim
+'''
+
+# How each stored date column is parsed when building a DataFrame
+_DATE_FORMATS = {
+    'date_applied': 'ISO8601',
+    'interview_date': 'mixed',  # Handle mixed datetime formats in the database
+    'created_at': 'ISO8601',
+    'updated_at': 'ISO8601'
+}
+
+
+def _open_connection(**connect_kwargs) -> sqlite3.Connection:
+    """Open a connection to DATABASE_PATH with the standard settings applied"""
+    conn = sqlite3.connect(DATABASE_PATH, **connect_kwargs)
+    conn.row_factory = sqlite3.Row  # This enables column access by name
+    # Per-connection settings: no fsync per commit (safe with WAL), temp
+    # tables/sorts in memory, a larger page cache, and reads served from a
+    # memory-mapped file
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    return conn
+
 
 def get_db_connection():
     """
-    Get SQLite database connection with row factory for dict-like access.
+    Get a new SQLite database connection with row factory for dict-like access.
+    The caller owns the connection and must close it.
     
     Returns:
         sqlite3.Connection: Database connection
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This enables column access by name
+    return _open_connection()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Get this thread's long-lived database connection.
+    
+    Reusing one connection keeps SQLite's page cache and the sqlite3 prepared
+    statement cache warm across calls. Callers must not close it.
+    
+    Returns:
+        sqlite3.Connection: Shared per-thread database connection
+    """
+    conns = getattr(_thread_local, 'conns', None)
+    if conns is None:
+        conns = _thread_local.conns = {}
+    
+    # Keyed by path so tests/scripts that repoint DATABASE_PATH get a fresh one
+    conn = conns.get(DATABASE_PATH)
+    if conn is None:
+        conn = conns[DATABASE_PATH] = _open_connection(cached_statements=STATEMENT_CACHE_SIZE)
+        if DATABASE_PATH not in _optimize_on_exit_paths:
+            _optimize_on_exit_paths.add(DATABASE_PATH)
+            atexit.register(_optimize_database, DATABASE_PATH)
     return conn
 
 
+def _optimize_database(path: str) -> None:
+    """Let SQLite refresh any stale planner statistics (run at process exit)"""
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            # 0x10002: also consider tables this fresh connection hasn't queried
+            conn.execute('PRAGMA optimize=0x10002')
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Error optimizing database: {e}")
+
+
 def init_db():
     """
     Initialize the database with required tables.
     Creates the applications table if it doesn't exist.
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        cursor = conn.cursor()
-        
-        # Create applications table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                msg_id TEXT UNIQUE,  -- Gmail message ID (for deduplication)
-                company TEXT,
-                role TEXT,
-                source TEXT DEFAULT 'manual',  -- 'gmail' or 'manual'
-                date_applied TEXT,  -- ISO format date
-                status TEXT DEFAULT 'applied',  -- applied, interview_scheduled, interviewed, rejected, offer, accepted
-                interview_date TEXT,  -- ISO format datetime
-                interview_round TEXT,  -- phone_screen, technical, onsite, final, etc.
-                notes TEXT,
-                snippet TEXT,  -- Email snippet for Gmail entries
-                email_subject TEXT,  -- Original email subject
-                email_from TEXT,  -- Original email from header
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create index on msg_id for faster lookups
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_msg_id ON applications(msg_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_company ON applications(company)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON applications(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_interview_date ON applications(interview_date)')
+        with conn:
+            cursor = conn.cursor()
+            
+            # WAL is persistent in the database file, so set it once here
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
+            # Create applications table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS applications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    msg_id TEXT UNIQUE,  -- Gmail message ID (for deduplication)
+                    company TEXT,
+                    role TEXT,
+                    source TEXT DEFAULT 'manual',  -- 'gmail' or 'manual'
+                    date_applied TEXT,  -- ISO format date
+                    status TEXT DEFAULT 'applied',  -- applied, interview_scheduled, interviewed, rejected, offer, accepted
+                    interview_date TEXT,  -- ISO format datetime
+                    interview_round TEXT,  -- phone_screen, technical, onsite, final, etc.
+                    notes TEXT,
+                    snippet TEXT,  -- Email snippet for Gmail entries
+                    email_subject TEXT,  -- Original email subject
+                    email_from TEXT,  -- Original email from header
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Classification results per Gmail message, so re-fetches skip the AI call
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS email_classifications (
+                    msg_id TEXT PRIMARY KEY,  -- Gmail message ID
+                    model TEXT NOT NULL,  -- Model and classifier version, e.g. gemini-2.5-flash@v2
+                    category TEXT,
+                    confidence REAL,
+                    reasoning TEXT,
+                    company TEXT,
+                    role TEXT,
+                    interview_scheduled INTEGER DEFAULT 0,
+                    status_suggestion TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create index on msg_id for faster lookups
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_msg_id ON applications(msg_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_company ON applications(company)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON applications(status)')
+            # Upcoming-interview lookups read only this covering partial index
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_interview_upcoming'")
+            needs_analyze = cursor.fetchone() is None
+            cursor.execute('DROP INDEX IF EXISTS idx_interview_date')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_interview_upcoming
+                ON applications(interview_date, id, company, role, interview_round, notes, email_subject, status)
+                WHERE interview_date IS NOT NULL
+            ''')
+            # Date-range listing, alone or combined with a status filter
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_date_applied ON applications(date_applied)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_status_date_applied ON applications(status, date_applied)')
+            # Partial indexes for the cleanup script's NULL-company and stale-interview passes
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_app_null_company ON applications(company)
+                WHERE company IS NULL OR company = ''
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_app_interview_scheduled ON applications(status)
+                WHERE status = 'interview_scheduled'
+            ''')
+            
+            _init_search_index(cursor)
+            
+            # Give the planner statistics for the new index the first time it exists
+            if needs_analyze:
+                cursor.execute('ANALYZE applications')
         
-        conn.commit()
         print("Database initialized successfully")
         
     except sqlite3.Error as e:
         print(f"Error initializing database: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
+
+
+def _init_search_index(cursor) -> None:
+    """
+    Create the applications_fts full-text index and the triggers that keep
+    it in sync with applications. Skipped if SQLite was built without FTS5.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'")
+    if cursor.fetchone():
+        return
+    
+    columns = ', '.join(FTS_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+    
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE applications_fts USING fts5(
+                {columns},
+                content='applications', content_rowid='id', tokenize='porter unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable, using LIKE search: {e}")
+        return
+    
+    # External-content sync: deletes replay the old values, updates do both
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+            INSERT INTO applications_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+            INSERT INTO applications_fts(applications_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE OF {columns} ON applications BEGIN
+            INSERT INTO applications_fts(applications_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO applications_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    
+    # Index the rows that existed before the table was added
+    cursor.execute("INSERT INTO applications_fts(applications_fts) VALUES ('rebuild')")
+
+
+def _has_search_index(conn: sqlite3.Connection) -> bool:
+    """Check whether init_db created the applications_fts index"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'").fetchone()
+    return row is not None
+
+
+def _fts_match(query: str, columns: Tuple[str, ...]) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression requiring every word of query as a prefix
+    in the given columns. Returns None if query has no searchable words.
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    prefixes = ' '.join(f'"{term}"*' for term in terms)
+    return f"{{{' '.join(columns)}}} : ({prefixes})"
+
+
+def _application_params(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a record to named parameters for _INSERT_SQL/_UPSERT_SQL"""
+    params = {}
+    for column in APPLICATION_COLUMNS:
+        value = record.get(column)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        params[column] = value
+    return params
 
 
 def upsert_application(record: Dict[str, Any]) -> int:
@@ -83,62 +348,26 @@ def upsert_application(record: Dict[str, Any]) -> int:
     Returns:
         int: Record ID
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        cursor = conn.cursor()
-        
-        # Convert datetime objects to ISO strings
-        if 'date_applied' in record and isinstance(record['date_applied'], datetime):
-            record['date_applied'] = record['date_applied'].isoformat()
-        if 'interview_date' in record and isinstance(record['interview_date'], datetime):
-            record['interview_date'] = record['interview_date'].isoformat()
-        
-        # Set updated timestamp
-        record['updated_at'] = datetime.now().isoformat()
-        
-        # Check if record exists (by msg_id if provided)
-        if record.get('msg_id'):
-            cursor.execute('SELECT id FROM applications WHERE msg_id = ?', (record['msg_id'],))
-            existing = cursor.fetchone()
+        with conn:
+            cursor = conn.cursor()
             
-            if existing:
-                # Update existing record
-                update_fields = []
-                update_values = []
-                
-                for key, value in record.items():
-                    if key != 'id':  # Don't update ID
-                        update_fields.append(f"{key} = ?")
-                        update_values.append(value)
-                
-                update_values.append(record['msg_id'])
-                
-                query = f'''
-                    UPDATE applications 
-                    SET {', '.join(update_fields)}
-                    WHERE msg_id = ?
-                '''
-                
-                cursor.execute(query, update_values)
-                record_id = existing['id']
-                print(f"Updated application record (ID: {record_id})")
+            if record.get('msg_id'):
+                # Single statement insert-or-update keyed on msg_id
+                cursor.execute(_UPSERT_RETURNING_SQL, _application_params(record))
+                record_id = cursor.fetchone()['id']
+                print(f"Upserted application record (ID: {record_id})")
             else:
-                # Insert new record
+                # Insert new record without msg_id (manual entry)
                 record_id = _insert_new_record(cursor, record)
-        else:
-            # Insert new record without msg_id (manual entry)
-            record_id = _insert_new_record(cursor, record)
         
-        conn.commit()
         return record_id
         
     except sqlite3.Error as e:
         print(f"Error upserting application: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 def _insert_new_record(cursor, record: Dict[str, Any]) -> int:
@@ -152,77 +381,282 @@ def _insert_new_record(cursor, record: Dict[str, Any]) -> int:
     Returns:
         int: New record ID
     """
-    # Get column names and values
-    columns = list(record.keys())
-    placeholders = ', '.join(['?' for _ in columns])
-    column_names = ', '.join(columns)
-    values = list(record.values())
-    
-    query = f'''
-        INSERT INTO applications ({column_names})
-        VALUES ({placeholders})
-    '''
-    
-    cursor.execute(query, values)
+    cursor.execute(_INSERT_SQL, _application_params(record))
     record_id = cursor.lastrowid
     print(f"Inserted new application record (ID: {record_id})")
     return record_id
 
 
-def list_applications(limit: Optional[int] = None) -> pd.DataFrame:
+def upsert_applications_bulk(records: List[Dict[str, Any]]) -> List[int]:
     """
-    Retrieve all applications as a pandas DataFrame.
+    Insert or update many Gmail application records in a single transaction.
+    
+    Records are matched on msg_id like upsert_application; columns missing
+    from a record (or None) keep their stored value on update. Records
+    without a msg_id are inserted as new rows.
+    
+    Args:
+        records: Application data dictionaries
+        
+    Returns:
+        List[int]: Record IDs, in the same order as records
+    """
+    if not records:
+        return []
+    
+    rows = [_application_params(record) for record in records]
+    keyed_rows = [row for row in rows if row['msg_id']]
+    
+    conn = _get_conn()
+    
+    try:
+        with conn:
+            # Take the write lock up front instead of upgrading mid-transaction
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(_UPSERT_SQL, keyed_rows)
+            
+            # executemany can't return rows, so look the IDs up afterwards
+            id_by_msg_id = {}
+            unique_ids = list(dict.fromkeys(row['msg_id'] for row in keyed_rows))
+            for start in range(0, len(unique_ids), SQL_PARAM_CHUNK):
+                chunk = unique_ids[start:start + SQL_PARAM_CHUNK]
+                placeholders = ', '.join('?' for _ in chunk)
+                for row in conn.execute(
+                    f'SELECT id, msg_id FROM applications WHERE msg_id IN ({placeholders})', chunk
+                ):
+                    id_by_msg_id[row['msg_id']] = row['id']
+            
+            cursor = conn.cursor()
+            record_ids = [
+                id_by_msg_id[row['msg_id']] if row['msg_id'] else _insert_new_record(cursor, row)
+                for row in rows
+            ]
+        
+        print(f"Upserted {len(rows)} application records")
+        return record_ids
+        
+    except sqlite3.Error as e:
+        print(f"Error bulk upserting applications: {e}")
+        raise
+
+
+def get_existing_msg_ids(msg_ids: List[str]) -> set:
+    """
+    Find which Gmail message IDs are already stored as applications.
+    
+    Args:
+        msg_ids: Gmail message IDs to check
+        
+    Returns:
+        set: The subset of msg_ids present in the applications table
+    """
+    if not msg_ids:
+        return set()
+    
+    conn = _get_conn()
+    
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT msg_id FROM applications WHERE msg_id IN ({', '.join(['?' for _ in msg_ids])})",
+            list(msg_ids)
+        )
+        return {row['msg_id'] for row in cursor.fetchall()}
+        
+    except sqlite3.Error as e:
+        print(f"Error checking message IDs: {e}")
+        raise
+
+
+def get_stored_classifications(msg_ids: List[str], models: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Load saved email classifications produced by one of the given models.
+    
+    Args:
+        msg_ids: Gmail message IDs to look up
+        models: Model labels (model and classifier version) to accept;
+            rows from any other model or version are ignored
+        
+    Returns:
+        Dict: msg_id -> classification fields
+    """
+    if not msg_ids:
+        return {}
+    
+    conn = _get_conn()
+    
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT msg_id, category, confidence, reasoning, company, role,
+                   interview_scheduled, status_suggestion
+            FROM email_classifications
+            WHERE model IN ({', '.join(['?' for _ in models])})
+              AND msg_id IN ({', '.join(['?' for _ in msg_ids])})
+        ''', [*models, *msg_ids])
+        
+        classifications = {}
+        for row in cursor.fetchall():
+            fields = dict(row)
+            msg_id = fields.pop('msg_id')
+            fields['interview_scheduled'] = bool(fields['interview_scheduled'])
+            classifications[msg_id] = fields
+        return classifications
+        
+    except sqlite3.Error as e:
+        print(f"Error loading classifications: {e}")
+        raise
+
+
+def save_classifications(classifications: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Save email classifications keyed by Gmail message ID.
+    
+    Args:
+        classifications: msg_id -> classification fields, including 'model'
+            (the model and classifier version that produced them)
+    """
+    if not classifications:
+        return
+    
+    rows = [
+        (msg_id, fields['model'], fields.get('category'), fields.get('confidence'), fields.get('reasoning'),
+         fields.get('company'), fields.get('role'), int(bool(fields.get('interview_scheduled'))),
+         fields.get('status_suggestion'))
+        for msg_id, fields in classifications.items()
+    ]
+    
+    conn = _get_conn()
+    
+    try:
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO email_classifications
+                (msg_id, model, category, confidence, reasoning, company, role,
+                 interview_scheduled, status_suggestion)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        
+    except sqlite3.Error as e:
+        print(f"Error saving classifications: {e}")
+        raise
+
+
+def _rows_to_frame(rows: List[sqlite3.Row], columns: Tuple[str, ...]) -> pd.DataFrame:
+    """Build a DataFrame from fetched rows, parsing each date column once"""
+    df = pd.DataFrame.from_records([tuple(row) for row in rows], columns=list(columns))
+    
+    # Convert date strings back to datetime objects for display
+    if not df.empty:
+        for column, date_format in _DATE_FORMATS.items():
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
+    
+    return df
+
+
+def list_application_rows(limit: Optional[int] = None,
+                          status_in: Optional[List[str]] = None,
+                          date_from: Optional[date] = None,
+                          date_to: Optional[date] = None,
+                          search: Optional[str] = None,
+                          before: Optional[Tuple[Optional[str], int]] = None) -> List[sqlite3.Row]:
+    """
+    Retrieve applications as sqlite3.Row objects, filtered in SQL.
+    
+    Rows come newest date_applied first. To page through them, pass a limit
+    and then the (date_applied, id) of the last row seen as before; the next
+    page starts right after it without re-reading the earlier rows.
     
     Args:
         limit: Maximum number of records to return
+        status_in: Only include these statuses
+        date_from: Earliest date_applied to include
+        date_to: Latest date_applied to include (whole day)
+        search: Text matched against company, role and notes
+        before: Keyset cursor (date_applied ISO string or None, id) to page from
         
     Returns:
-        pd.DataFrame: Applications data
+        List[sqlite3.Row]: Applications data, columns as in LIST_COLUMNS
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        query = '''
-            SELECT 
-                id,
-                company,
-                role,
-                source,
-                date_applied,
-                status,
-                interview_date,
-                interview_round,
-                notes,
-                email_subject,
-                email_from,
-                created_at,
-                updated_at
+        conditions = []
+        params = []
+        
+        if status_in:
+            conditions.append(f"status IN ({', '.join(['?' for _ in status_in])})")
+            params.extend(status_in)
+        
+        # date_applied is stored as ISO text, so string comparison orders correctly;
+        # the range and the ORDER BY below both resolve against the same column
+        if date_from:
+            conditions.append('date_applied >= ?')
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append('date_applied < ?')
+            params.append((date_to + ONE_DAY).isoformat())
+        
+        if search:
+            match = _fts_match(search, SEARCH_COLUMNS) if _has_search_index(conn) else None
+            if match:
+                conditions.append('id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?)')
+                params.append(match)
+            else:
+                conditions.append('(company LIKE ? OR role LIKE ? OR notes LIKE ?)')
+                params.extend([f'%{search}%'] * 3)
+        
+        if before:
+            # Continue after the cursor row in (date_applied DESC, id DESC) order;
+            # rows without a date sort last
+            before_date, before_id = before
+            if before_date is None:
+                conditions.append('(date_applied IS NULL AND id < ?)')
+                params.append(before_id)
+            else:
+                conditions.append(
+                    '(date_applied < ? OR (date_applied = ? AND id < ?) OR date_applied IS NULL)'
+                )
+                params.extend([before_date, before_date, before_id])
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        query = f'''
+            SELECT {', '.join(LIST_COLUMNS)}
             FROM applications
-            ORDER BY created_at DESC
+            {where_clause}
+            ORDER BY date_applied DESC, id DESC
         '''
         
         if limit:
-            query += f' LIMIT {limit}'
-        
-        df = pd.read_sql_query(query, conn)
-        
-        # Convert date strings back to datetime objects for display
-        if not df.empty:
-            df['date_applied'] = pd.to_datetime(df['date_applied'], errors='coerce')
-            df['interview_date'] = pd.to_datetime(df['interview_date'], format='mixed', errors='coerce')
-            df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
-            df['updated_at'] = pd.to_datetime(df['updated_at'], errors='coerce')
+            query += ' LIMIT ?'
+            params.append(limit)
         
-        return df
+        return conn.execute(query, params).fetchall()
         
     except sqlite3.Error as e:
         print(f"Error listing applications: {e}")
         raise
-    finally:
-        conn.close()
 
 
-def get_upcoming_interviews(days_ahead: int = 7) -> pd.DataFrame:
+def list_applications(limit: Optional[int] = None,
+                      status_in: Optional[List[str]] = None,
+                      date_from: Optional[date] = None,
+                      date_to: Optional[date] = None,
+                      search: Optional[str] = None,
+                      before: Optional[Tuple[Optional[str], int]] = None) -> pd.DataFrame:
+    """
+    Retrieve applications as a pandas DataFrame (see list_application_rows).
+    
+    Returns:
+        pd.DataFrame: Applications data
+    """
+    rows = list_application_rows(limit, status_in, date_from, date_to, search, before)
+    return _rows_to_frame(rows, LIST_COLUMNS)
+
+
+def get_upcoming_interview_rows(days_ahead: int = 7) -> List[sqlite3.Row]:
     """
     Get applications with upcoming interviews within specified days.
     
@@ -230,24 +664,16 @@ def get_upcoming_interviews(days_ahead: int = 7) -> pd.DataFrame:
         days_ahead: Number of days to look ahead
         
     Returns:
-        pd.DataFrame: Upcoming interviews
+        List[sqlite3.Row]: Upcoming interviews, columns as in UPCOMING_COLUMNS
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
         cutoff_date = (datetime.now() + timedelta(days=days_ahead)).isoformat()
         current_date = datetime.now().isoformat()
         
-        query = '''
-            SELECT 
-                id,
-                company,
-                role,
-                interview_date,
-                interview_round,
-                notes,
-                email_subject,
-                status
+        query = f'''
+            SELECT {', '.join(UPCOMING_COLUMNS)}
             FROM applications
             WHERE interview_date IS NOT NULL 
               AND interview_date >= ?
@@ -255,19 +681,24 @@ def get_upcoming_interviews(days_ahead: int = 7) -> pd.DataFrame:
             ORDER BY interview_date ASC
         '''
         
-        df = pd.read_sql_query(query, conn, params=(current_date, cutoff_date))
-        
-        if not df.empty:
-            # Handle mixed datetime formats in the database
-            df['interview_date'] = pd.to_datetime(df['interview_date'], format='mixed', errors='coerce')
-        
-        return df
+        return conn.execute(query, (current_date, cutoff_date)).fetchall()
         
     except sqlite3.Error as e:
         print(f"Error getting upcoming interviews: {e}")
         raise
-    finally:
-        conn.close()
+
+
+def get_upcoming_interviews(days_ahead: int = 7) -> pd.DataFrame:
+    """
+    Get applications with upcoming interviews as a pandas DataFrame.
+    
+    Args:
+        days_ahead: Number of days to look ahead
+        
+    Returns:
+        pd.DataFrame: Upcoming interviews
+    """
+    return _rows_to_frame(get_upcoming_interview_rows(days_ahead), UPCOMING_COLUMNS)
 
 
 def update_application_status(app_id: int, new_status: str, notes: Optional[str] = None) -> bool:
@@ -282,30 +713,17 @@ def update_application_status(app_id: int, new_status: str, notes: Optional[str]
     Returns:
         bool: Success status
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        cursor = conn.cursor()
-        
-        update_fields = ['status = ?', 'updated_at = ?']
-        update_values = [new_status, datetime.now().isoformat()]
-        
-        if notes:
-            update_fields.append('notes = ?')
-            update_values.append(notes)
-        
-        update_values.append(app_id)
-        
-        query = f'''
-            UPDATE applications 
-            SET {', '.join(update_fields)}
-            WHERE id = ?
-        '''
-        
-        cursor.execute(query, update_values)
+        with conn:
+            cursor = conn.execute('''
+                UPDATE applications 
+                SET status = ?, notes = COALESCE(?, notes), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (new_status, notes or None, app_id))
         
         if cursor.rowcount > 0:
-            conn.commit()
             print(f"Updated application {app_id} status to {new_status}")
             return True
         else:
@@ -314,10 +732,7 @@ def update_application_status(app_id: int, new_status: str, notes: Optional[str]
             
     except sqlite3.Error as e:
         print(f"Error updating application status: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 def delete_application(app_id: int) -> bool:
@@ -330,14 +745,13 @@ def delete_application(app_id: int) -> bool:
     Returns:
         bool: Success status
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM applications WHERE id = ?', (app_id,))
+        with conn:
+            cursor = conn.execute('DELETE FROM applications WHERE id = ?', (app_id,))
         
         if cursor.rowcount > 0:
-            conn.commit()
             print(f"Deleted application {app_id}")
             return True
         else:
@@ -346,10 +760,70 @@ def delete_application(app_id: int) -> bool:
             
     except sqlite3.Error as e:
         print(f"Error deleting application: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
+
+
+def update_application_status_many(updates: List[Tuple[int, str, Optional[str]]]) -> int:
+    """
+    Update the status (and optionally notes) of several applications in one transaction.
+    
+    Args:
+        updates: (application ID, new status, notes or None to keep existing notes)
+        
+    Returns:
+        int: Number of applications updated
+    """
+    if not updates:
+        return 0
+    
+    conn = _get_conn()
+    
+    try:
+        with conn:
+            cursor = conn.executemany(
+                '''
+                UPDATE applications
+                SET status = ?, notes = COALESCE(?, notes), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                ''',
+                [(status, notes, app_id) for app_id, status, notes in updates]
+            )
+        print(f"Updated status of {cursor.rowcount} applications")
+        return cursor.rowcount
+        
+    except sqlite3.Error as e:
+        print(f"Error updating application statuses: {e}")
+        raise
+
+
+def delete_applications(app_ids: List[int]) -> int:
+    """
+    Delete several application records in one transaction.
+    
+    Args:
+        app_ids: Application IDs to delete
+        
+    Returns:
+        int: Number of applications deleted
+    """
+    if not app_ids:
+        return 0
+    
+    conn = _get_conn()
+    
+    try:
+        with conn:
+            # IDs travel as one JSON array, so any number fits in a single parameter
+            cursor = conn.execute(
+                'DELETE FROM applications WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps([int(app_id) for app_id in app_ids]),)
+            )
+        print(f"Deleted {cursor.rowcount} applications")
+        return cursor.rowcount
+        
+    except sqlite3.Error as e:
+        print(f"Error deleting applications: {e}")
+        raise
 
 
 def get_application_stats() -> Dict[str, Any]:
@@ -359,95 +833,90 @@ def get_application_stats() -> Dict[str, Any]:
     Returns:
         Dict: Statistics summary
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
         cursor = conn.cursor()
         
-        stats = {}
-        
-        # Total applications
-        cursor.execute('SELECT COUNT(*) FROM applications')
-        stats['total_applications'] = cursor.fetchone()[0]
-        
-        # Applications by status
-        cursor.execute('''
-            SELECT status, COUNT(*) as count
-            FROM applications 
-            GROUP BY status
-        ''')
-        stats['by_status'] = dict(cursor.fetchall())
-        
-        # Applications by source
-        cursor.execute('''
-            SELECT source, COUNT(*) as count
-            FROM applications 
-            GROUP BY source
-        ''')
-        stats['by_source'] = dict(cursor.fetchall())
-        
-        # Upcoming interviews count
         cutoff_date = (datetime.now() + timedelta(days=7)).isoformat()
         current_date = datetime.now().isoformat()
+        
+        # One statement for all four aggregates, each row tagged with its bucket
         cursor.execute('''
-            SELECT COUNT(*) FROM applications
+            SELECT 'total', NULL, COUNT(*) FROM applications
+            UNION ALL
+            SELECT 'status', status, COUNT(*) FROM applications GROUP BY status
+            UNION ALL
+            SELECT 'source', source, COUNT(*) FROM applications GROUP BY source
+            UNION ALL
+            SELECT 'upcoming', NULL, COUNT(*) FROM applications
             WHERE interview_date IS NOT NULL 
               AND interview_date >= ?
               AND interview_date <= ?
         ''', (current_date, cutoff_date))
-        stats['upcoming_interviews'] = cursor.fetchone()[0]
+        
+        stats = {'by_status': {}, 'by_source': {}}
+        for tag, key, count in cursor.fetchall():
+            if tag == 'total':
+                stats['total_applications'] = count
+            elif tag == 'upcoming':
+                stats['upcoming_interviews'] = count
+            else:
+                stats[f'by_{tag}'][key] = count
         
         return stats
         
     except sqlite3.Error as e:
         print(f"Error getting application stats: {e}")
         raise
-    finally:
-        conn.close()
 
 
-def search_applications(query: str, field: str = 'all') -> pd.DataFrame:
+def search_application_rows(query: str, field: str = 'all', limit: Optional[int] = None) -> List[sqlite3.Row]:
     """
     Search applications by company, role, or notes.
     
     Args:
         query: Search query
-        field: Field to search ('company', 'role', 'notes', 'all')
+        field: Field to search ('company', 'role', 'notes', 'email_subject', 'all')
+        limit: Maximum number of records to return
         
     Returns:
-        pd.DataFrame: Search results
+        List[sqlite3.Row]: Search results, columns as in LIST_COLUMNS
     """
-    conn = get_db_connection()
+    conn = _get_conn()
     
     try:
-        if field == 'all':
-            sql_query = '''
-                SELECT * FROM applications
-                WHERE company LIKE ? OR role LIKE ? OR notes LIKE ?
-                ORDER BY updated_at DESC
-            '''
-            params = [f'%{query}%', f'%{query}%', f'%{query}%']
-        else:
-            sql_query = f'''
-                SELECT * FROM applications
-                WHERE {field} LIKE ?
-                ORDER BY updated_at DESC
-            '''
-            params = [f'%{query}%']
+        params = {'field': field, 'lim': limit or -1}  # negative LIMIT means no limit
         
-        df = pd.read_sql_query(sql_query, conn, params=params)
+        match = None
+        if (field == 'all' or field in FTS_COLUMNS) and _has_search_index(conn):
+            match = _fts_match(query, SEARCH_COLUMNS if field == 'all' else (field,))
         
-        if not df.empty:
-            df['date_applied'] = pd.to_datetime(df['date_applied'], errors='coerce')
-            df['interview_date'] = pd.to_datetime(df['interview_date'], format='mixed', errors='coerce')
+        if match:
+            params['match'] = match
+            return conn.execute(_SEARCH_FTS_SQL, params).fetchall()
         
-        return df
+        params['pattern'] = f'%{query}%'
+        return conn.execute(_SEARCH_LIKE_SQL, params).fetchall()
         
     except sqlite3.Error as e:
         print(f"Error searching applications: {e}")
         raise
-    finally:
-        conn.close()
+
+
+def search_applications(query: str, field: str = 'all', limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Search applications by company, role, or notes, as a pandas DataFrame.
+    
+    Args:
+        query: Search query
+        field: Field to search ('company', 'role', 'notes', 'email_subject', 'all')
+        limit: Maximum number of records to return
+        
+    Returns:
+        pd.DataFrame: Search results
+    """
+    return _rows_to_frame(search_application_rows(query, field, limit), LIST_COLUMNS)
 
 
 if __name__ == "__main__":
@@ -4,7 +4,6 @@ Handles guided walkthrough, reset functionality, and multiple demo experiences
 """
 
 import streamlit as st
-import sqlite3
 import json
 import time
 import random
@@ -12,25 +11,114 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 
-# Load demo data
-def load_demo_data():
-    """Load sample data from JSON files"""
+from read_models import invalidate_cached_reads
+
+# Load demo data (each file is read on first use, then cached per server process)
+@st.cache_data(show_spinner=False)
+def _read_sample_data():
+    """Read and parse the sample applications and scenarios JSON file"""
+    with open('demo_data/sample_data.json', 'r') as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False)
+def _read_company_intel():
+    """Read and parse the company interview intelligence JSON file"""
+    with open('demo_data/company_intelligence.json', 'r') as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False)
+def _read_scenarios_by_name():
+    """Demo scenarios keyed by display name, in file order"""
+    scenarios = _read_sample_data().get('demo_scenarios', {})
+    return {scenario['name']: scenario for scenario in scenarios.values()}
+
+@st.cache_data(show_spinner=False)
+def _read_scenario_names():
+    """Scenario names for the sidebar picker, in file order"""
+    return tuple(_read_scenarios_by_name())
+
+def load_sample_data():
+    """Load sample applications and scenarios"""
     try:
-        with open('demo_data/sample_data.json', 'r') as f:
-            sample_data = json.load(f)
-        
-        with open('demo_data/company_intelligence.json', 'r') as f:
-            company_intel = json.load(f)
-            
-        return sample_data, company_intel
+        # Errors propagate out of the cached reader, so a missing file isn't memoized
+        return _read_sample_data()
+    except FileNotFoundError:
+        st.error("Demo data files not found. Please check demo_data directory.")
+        return {}
+
+def load_scenario_names():
+    """Load the demo scenario names"""
+    try:
+        return _read_scenario_names()
+    except FileNotFoundError:
+        st.error("Demo data files not found. Please check demo_data directory.")
+        return ()
+
+def load_scenarios_by_name():
+    """Load the demo scenarios keyed by display name"""
+    try:
+        return _read_scenarios_by_name()
     except FileNotFoundError:
         st.error("Demo data files not found. Please check demo_data directory.")
-        return {}, {}
+        return {}
+
+def load_company_intel():
+    """Load company interview intelligence (only needed by walkthrough step 4)"""
+    try:
+        return _read_company_intel()
+    except FileNotFoundError:
+        st.error("Demo data files not found. Please check demo_data directory.")
+        return {}
+
+# Session state keys written by the demo, cleared together on reset
+DEMO_SESSION_KEYS = (
+    'demo_mode', 'demo_experience', 'demo_user_id', 'walkthrough_step',
+    'applications_added', 'emails_processed', 'last_application', 'current_email'
+)
+
+# Sidebar experience selector: label -> demo_experience value
+DEMO_MODES = {
+    "🚀 Quick Overview": "full",
+    "🎯 Guided Walkthrough": "guided", 
+    "🔄 Start Fresh": "fresh",
+    "🎮 Sandbox Mode": "sandbox"
+}
+DEMO_MODE_LABELS = tuple(DEMO_MODES)
+
+# Walkthrough step 1 choices
+DEMO_COMPANIES = ("Google", "Microsoft", "Meta", "Amazon", "Netflix")
+DEMO_ROLES = ("Software Engineer", "Product Manager", "Data Scientist", "DevOps Engineer")
+
+# Simulated recruiter replies for walkthrough step 2, by company
+SAMPLE_EMAILS = {
+    "Google": "Subject: Interview Invitation - Software Engineer Position\nFrom: sarah.chen@google.com\n\nHi! We'd like to schedule a phone screen for the Software Engineer position. Are you available next week?",
+    "Microsoft": "Subject: Next Steps - Product Manager Role\nFrom: recruiter@microsoft.com\n\nThank you for your interest! We'd love to chat about the Product Manager opportunity.",
+    "Meta": "Subject: Interview Scheduling - Data Scientist\nFrom: hiring@meta.com\n\nCongratulations! We'd like to move forward with an interview for the Data Scientist role.",
+    "Amazon": "Subject: Interview Opportunity - DevOps Engineer\nFrom: talent@amazon.com\n\nWe're impressed with your background and would like to schedule an interview.",
+    "Netflix": "Subject: Technical Interview - Software Engineer\nFrom: engineering@netflix.com\n\nWe're excited to learn more about you through a technical interview."
+}
+
+# Completed research steps shown in walkthrough step 4
+RESEARCH_STEPS = (
+    "🔍 Analyzed recent interview experiences",
+    "📊 Processed company interview patterns",
+    "🎯 Generated personalized preparation plan",
+    "✨ Compiled intelligence report"
+)
 
 class DemoController:
     """Controls demo modes, walkthrough, and reset functionality"""
     
     def __init__(self):
+        # Walkthrough step handlers, indexed by st.session_state.walkthrough_step
+        self._walkthrough_steps = (
+            self.walkthrough_welcome,
+            self.walkthrough_add_application,
+            self.walkthrough_email_simulation,
+            self.walkthrough_ai_classification,
+            self.walkthrough_intelligence_generation,
+            self.walkthrough_complete
+        )
         self.initialize_demo_session()
     
     def initialize_demo_session(self):
@@ -50,26 +138,19 @@ class DemoController:
             st.markdown("### 🎭 Demo Experience")
             
             # Demo mode selector
-            demo_modes = {
-                "🚀 Quick Overview": "full",
-                "🎯 Guided Walkthrough": "guided", 
-                "🔄 Start Fresh": "fresh",
-                "🎮 Sandbox Mode": "sandbox"
-            }
-            
             selected_mode = st.selectbox(
                 "Choose your experience:",
-                options=list(demo_modes.keys()),
+                options=DEMO_MODE_LABELS,
                 index=1 if st.session_state.get('demo_experience', 'welcome') == "guided" else 0
             )
             
             if st.button("🎬 Switch Experience"):
-                st.session_state.demo_experience = demo_modes[selected_mode]
-                if demo_modes[selected_mode] == "fresh":
+                st.session_state.demo_experience = DEMO_MODES[selected_mode]
+                if DEMO_MODES[selected_mode] == "fresh":
                     self.reset_demo()
-                elif demo_modes[selected_mode] == "full":
+                elif DEMO_MODES[selected_mode] == "full":
                     self.load_full_demo()
-                elif demo_modes[selected_mode] == "guided":
+                elif DEMO_MODES[selected_mode] == "guided":
                     self.start_guided_walkthrough()
                 st.rerun()
             
@@ -92,33 +173,25 @@ class DemoController:
             # Scenario selector for fresh starts
             if st.session_state.get('demo_experience', 'welcome') in ["fresh", "guided"]:
                 st.markdown("#### 🎲 Try a Scenario")
-                sample_data, _ = load_demo_data()
-                scenarios = sample_data.get('demo_scenarios', {})
-                
-                scenario_names = [f"{scenario['name']}" for scenario in scenarios.values()]
-                selected_scenario = st.selectbox("Pick a scenario:", ["Choose...", *scenario_names])
+                selected_scenario = st.selectbox("Pick a scenario:", ("Choose...", *load_scenario_names()))
                 
                 if selected_scenario != "Choose..." and st.button("🎬 Load Scenario"):
-                    self.load_scenario(selected_scenario, scenarios)
+                    self.load_scenario(selected_scenario, load_scenarios_by_name())
                     st.rerun()
     
     def reset_demo(self):
         """Reset demo to clean state"""
-        # Clear demo session state
-        demo_keys = [key for key in st.session_state.keys() if key.startswith('demo_') or key.startswith('walkthrough_')]
-        for key in demo_keys:
-            del st.session_state[key]
+        # Clear demo session state (only the keys the demo owns, not every key)
+        for key in DEMO_SESSION_KEYS:
+            st.session_state.pop(key, None)
         
-        # Reset demo state
-        st.session_state.demo_mode = True
+        # Reset demo state ('demo_mode' was popped above, so this re-seeds the defaults)
+        self.initialize_demo_session()
         st.session_state.demo_experience = "fresh"
-        st.session_state.walkthrough_step = 0
-        st.session_state.demo_user_id = f"demo_{random.randint(1000, 9999)}"
-        st.session_state.applications_added = []
-        st.session_state.emails_processed = []
         
         # Create clean demo database
         self.create_clean_demo_database()
+        invalidate_cached_reads()
         
         st.balloons()
     
@@ -128,15 +201,7 @@ class DemoController:
             # Import database initialization
             from db_utils import init_db
             
-            # Create clean demo database
-            demo_user_id = st.session_state.get('demo_user_id', f"demo_{random.randint(1000, 9999)}")
-            demo_db_path = f"demo_{demo_user_id}.db"
-            
-            # Initialize empty database
-            conn = sqlite3.connect(demo_db_path)
-            conn.close()
-            
-            # Initialize with schema but no data
+            # Initialize with schema but no data (reuses db_utils' per-thread connection)
             init_db()  # This will create tables in jobs.db
             
         except Exception as e:
@@ -145,24 +210,30 @@ class DemoController:
     def load_full_demo(self):
         """Load full demo with all sample data"""
         st.session_state.demo_experience = "full"
-        sample_data, _ = load_demo_data()
+        sample_data = load_sample_data()
         
         # Load all sample applications
         try:
-            from db_utils import upsert_application
+            from db_utils import upsert_applications_bulk
             
-            for app_data in sample_data.get('sample_applications', []):
-                upsert_application(
-                    msg_id=f"demo_{app_data['company']}_{random.randint(100, 999)}",
-                    company=app_data['company'],
-                    role=app_data['role'],
-                    status=app_data['status'],
-                    date_applied=app_data['date_applied'],
-                    interview_date=app_data.get('interview_date'),
-                    interview_round=app_data.get('interview_round'),
-                    notes=app_data.get('notes', ''),
-                    source='demo'
-                )
+            # Deterministic IDs, so reloading the demo updates rows instead of duplicating them
+            records = [
+                {
+                    'msg_id': f"demo_{st.session_state.demo_user_id}_{i}_{app_data['company']}",
+                    'company': app_data['company'],
+                    'role': app_data['role'],
+                    'status': app_data['status'],
+                    'date_applied': app_data['date_applied'],
+                    'interview_date': app_data.get('interview_date'),
+                    'interview_round': app_data.get('interview_round'),
+                    'notes': app_data.get('notes', ''),
+                    'source': 'demo'
+                }
+                for i, app_data in enumerate(sample_data.get('sample_applications', []))
+            ]
+            # One transaction for the whole sample set
+            upsert_applications_bulk(records)
+            invalidate_cached_reads()
             
         except Exception as e:
             st.error(f"Error loading demo data: {e}")
@@ -180,21 +251,16 @@ class DemoController:
             
         step = st.session_state.get('walkthrough_step', 0)
         
-        if step == 0:
-            return self.walkthrough_welcome()
-        elif step == 1:
-            return self.walkthrough_add_application()
-        elif step == 2:
-            return self.walkthrough_email_simulation()
-        elif step == 3:
-            return self.walkthrough_ai_classification()
-        elif step == 4:
-            return self.walkthrough_intelligence_generation()
-        elif step == 5:
-            return self.walkthrough_complete()
-        
-        return False
+        # Each step is a fragment, so widget interactions rerun only that step.
+        # Step changes still use a full st.rerun() because the banner and the
+        # sidebar controls show the current step.
+        if not 0 <= step < len(self._walkthrough_steps):
+            return False
+        
+        self._walkthrough_steps[step]()
+        return True
     
+    @st.fragment
     def walkthrough_welcome(self):
         """Step 0: Welcome and introduction"""
         st.markdown("# 🎯 Welcome to Your AI Job Tracker!")
@@ -220,6 +286,7 @@ class DemoController:
         
         return True
     
+    @st.fragment
     def walkthrough_add_application(self):
         """Step 1: Add first job application"""
         st.markdown("### 📝 Step 1: Add Your First Job Application")
@@ -231,23 +298,24 @@ class DemoController:
             
             col1, col2 = st.columns(2)
             with col1:
-                company = st.selectbox("Company:", ["Google", "Microsoft", "Meta", "Amazon", "Netflix"])
+                company = st.selectbox("Company:", DEMO_COMPANIES)
             with col2:
-                role = st.selectbox("Role:", ["Software Engineer", "Product Manager", "Data Scientist", "DevOps Engineer"])
+                role = st.selectbox("Role:", DEMO_ROLES)
             
             if st.form_submit_button("🎯 Apply to This Job!", use_container_width=True):
                 # Add application to database
                 try:
                     from db_utils import upsert_application
                     
-                    app_id = upsert_application(
-                        msg_id=f"demo_{company}_{random.randint(100, 999)}",
-                        company=company,
-                        role=role,
-                        status='applied',
-                        date_applied=datetime.now().strftime('%Y-%m-%d'),
-                        source='demo'
-                    )
+                    app_id = upsert_application({
+                        'msg_id': f"demo_{st.session_state.demo_user_id}_{company}_{role}",
+                        'company': company,
+                        'role': role,
+                        'status': 'applied',
+                        'date_applied': datetime.now().strftime('%Y-%m-%d'),
+                        'source': 'demo'
+                    })
+                    invalidate_cached_reads()
                     
                     st.session_state.applications_added.append({
                         'company': company, 
@@ -266,6 +334,7 @@ class DemoController:
         
         return True
     
+    @st.fragment
     def walkthrough_email_simulation(self):
         """Step 2: Simulate receiving an email"""
         last_app = st.session_state.get('last_application', {})
@@ -275,16 +344,7 @@ class DemoController:
         
         st.markdown(f"**Great news! You received an email from {company}:**")
         
-        # Simulate email content
-        sample_emails = {
-            "Google": "Subject: Interview Invitation - Software Engineer Position\nFrom: sarah.chen@google.com\n\nHi! We'd like to schedule a phone screen for the Software Engineer position. Are you available next week?",
-            "Microsoft": "Subject: Next Steps - Product Manager Role\nFrom: recruiter@microsoft.com\n\nThank you for your interest! We'd love to chat about the Product Manager opportunity.",
-            "Meta": "Subject: Interview Scheduling - Data Scientist\nFrom: hiring@meta.com\n\nCongratulations! We'd like to move forward with an interview for the Data Scientist role.",
-            "Amazon": "Subject: Interview Opportunity - DevOps Engineer\nFrom: talent@amazon.com\n\nWe're impressed with your background and would like to schedule an interview.",
-            "Netflix": "Subject: Technical Interview - Software Engineer\nFrom: engineering@netflix.com\n\nWe're excited to learn more about you through a technical interview."
-        }
-        
-        email_content = sample_emails.get(company, sample_emails["Google"])
+        email_content = SAMPLE_EMAILS.get(company, SAMPLE_EMAILS["Google"])
         
         st.text_area("Email Content:", email_content, height=100, disabled=True)
         
@@ -297,16 +357,15 @@ class DemoController:
         
         return True
     
+    @st.fragment
     def walkthrough_ai_classification(self):
         """Step 3: Show AI email classification in action"""
         st.markdown("### 🤖 Step 3: AI Email Classification in Action")
         
-        # Show AI processing with realistic delay
+        # Show AI processing with a short delay (one progress update, not one per percent)
         with st.spinner("🧠 AI analyzing email content..."):
-            progress_bar = st.progress(0)
-            for i in range(100):
-                time.sleep(0.02)  # Total 2 seconds
-                progress_bar.progress(i + 1)
+            time.sleep(0.4)
+        st.progress(100)
         
         # Show classification results
         st.success("✅ **AI Classification Complete!**")
@@ -339,6 +398,7 @@ class DemoController:
         
         return True
     
+    @st.fragment
     def walkthrough_intelligence_generation(self):
         """Step 4: Generate company-specific interview intelligence"""
         last_app = st.session_state.get('last_application', {})
@@ -348,28 +408,16 @@ class DemoController:
         
         st.markdown(f"**Now the AI researches {company}'s interview process for you...**")
         
-        # Show research process with realistic delays
-        research_steps = [
-            "🔍 Analyzing recent interview experiences...",
-            "📊 Processing company interview patterns...",
-            "🎯 Generating personalized preparation plan...",
-            "✨ Compiling intelligence report..."
-        ]
+        # Warm the (cached) intelligence data before the animation starts
+        intel_data = load_company_intel().get(company, {})
         
-        progress_container = st.empty()
+        # Show research process with one short delay, then all steps at once
+        with st.spinner("🔍 Researching interview intelligence..."):
+            time.sleep(1.0)
         
-        for i, step in enumerate(research_steps):
-            with progress_container:
-                st.info(step)
-            time.sleep(1.5)
-        
-        progress_container.empty()
+        st.markdown("\n".join(f"- ✅ {step}" for step in RESEARCH_STEPS))
         st.success("🎉 **Interview Intelligence Generated!**")
         
-        # Show intelligence report
-        _, company_intel = load_demo_data()
-        intel_data = company_intel.get(company, {})
-        
         if intel_data:
             st.markdown(f"### 📋 {company} Interview Intelligence Report")
             
@@ -402,6 +450,7 @@ class DemoController:
         
         return True
     
+    @st.fragment
     def walkthrough_complete(self):
         """Step 5: Walkthrough complete"""
         st.balloons()
@@ -442,14 +491,9 @@ class DemoController:
         
         return True
     
-    def load_scenario(self, scenario_name: str, scenarios: Dict):
+    def load_scenario(self, scenario_name: str, scenarios_by_name: Dict):
         """Load a specific demo scenario"""
-        # Find matching scenario
-        scenario_data = None
-        for scenario in scenarios.values():
-            if scenario['name'] == scenario_name:
-                scenario_data = scenario
-                break
+        scenario_data = scenarios_by_name.get(scenario_name)
         
         if not scenario_data:
             st.error("Scenario not found!")
@@ -460,17 +504,22 @@ class DemoController:
         
         # Load scenario applications
         try:
-            from db_utils import upsert_application
+            from db_utils import upsert_applications_bulk
             
-            for app_data in scenario_data.get('applications', []):
-                upsert_application(
-                    msg_id=f"demo_scenario_{app_data['company']}_{random.randint(100, 999)}",
-                    company=app_data['company'],
-                    role=app_data['role'], 
-                    status=app_data['status'],
-                    date_applied=datetime.now().strftime('%Y-%m-%d'),
-                    source='demo_scenario'
-                )
+            date_applied = datetime.now().strftime('%Y-%m-%d')
+            records = [
+                {
+                    'msg_id': f"demo_scenario_{st.session_state.demo_user_id}_{i}_{app_data['company']}",
+                    'company': app_data['company'],
+                    'role': app_data['role'],
+                    'status': app_data['status'],
+                    'date_applied': date_applied,
+                    'source': 'demo_scenario'
+                }
+                for i, app_data in enumerate(scenario_data.get('applications', []))
+            ]
+            upsert_applications_bulk(records)
+            invalidate_cached_reads()
             
             st.session_state.demo_experience = "full"
             st.success(f"Loaded scenario: {scenario_name}")
@@ -493,9 +542,14 @@ class DemoController:
             else:
                 st.info("🎭 **Demo Mode** - Interactive experience with sample data.")
 
-# Global demo controller instance
-demo_controller = DemoController()
+@st.cache_resource
+def _shared_demo_controller():
+    """One DemoController per server process (it holds no per-user state)"""
+    return DemoController()
 
 def get_demo_controller():
-    """Get the global demo controller instance"""
-    return demo_controller
\ No newline at end of file
+    """Get the shared demo controller, with this session's demo state initialized"""
+    controller = _shared_demo_controller()
+    # The instance is shared, so each new session still needs its defaults
+    controller.initialize_demo_session()
+    return controller
\ No newline at end of file
@@ -6,18 +6,89 @@ Properly add missing columns for Kanban functionality.
 import sqlite3
 from datetime import datetime
 
+# Stored in PRAGMA user_version once this migration has been applied
+# (4: drops the unused application_tags table that versions 2-3 created)
+KANBAN_SCHEMA_VERSION = 4
+
+# Kanban tables and indexes, run as one script (every statement is IF [NOT] EXISTS)
+KANBAN_DDL = """
+CREATE TABLE IF NOT EXISTS stage_transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_id INTEGER NOT NULL,
+    from_stage TEXT,
+    to_stage TEXT NOT NULL,
+    transition_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT,
+    automated BOOLEAN DEFAULT FALSE,
+    FOREIGN KEY (application_id) REFERENCES applications (id)
+);
+
+CREATE TABLE IF NOT EXISTS interview_rounds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_id INTEGER NOT NULL,
+    round_type TEXT NOT NULL,
+    scheduled_date TEXT,
+    completed_date TEXT,
+    interviewer_name TEXT,
+    interviewer_email TEXT,
+    interview_link TEXT,
+    notes TEXT,
+    outcome TEXT,
+    feedback TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (application_id) REFERENCES applications (id)
+);
+
+CREATE TABLE IF NOT EXISTS application_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_id INTEGER NOT NULL,
+    note_type TEXT DEFAULT 'general',
+    content TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (application_id) REFERENCES applications (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_board_stage ON applications(board_stage);
+CREATE INDEX IF NOT EXISTS idx_stage_position ON applications(stage_position);
+CREATE INDEX IF NOT EXISTS idx_priority ON applications(priority);
+CREATE INDEX IF NOT EXISTS idx_stage_entered_date ON applications(stage_entered_date);
+CREATE INDEX IF NOT EXISTS idx_transitions_app_id ON stage_transitions(application_id);
+CREATE INDEX IF NOT EXISTS idx_interview_rounds_app_id ON interview_rounds(application_id);
+CREATE INDEX IF NOT EXISTS idx_notes_app_id ON application_notes(application_id);
+
+-- Nothing reads application_tags, so don't pay for its triggers on every write
+DROP TRIGGER IF EXISTS application_tags_insert;
+DROP TRIGGER IF EXISTS application_tags_update;
+DROP TRIGGER IF EXISTS application_tags_delete;
+DROP TABLE IF EXISTS application_tags;
+"""
+
 def fix_kanban_database():
     """Fix the database schema for Kanban board functionality"""
     
     conn = sqlite3.connect('jobs.db')
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
+    # WAL lets the app keep reading during the migration; NORMAL sync skips
+    # the per-statement fsync, and sorts/temp b-trees for the indexes stay in memory
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-20000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    
     try:
+        # Already migrated: skip the schema scan and ALTERs entirely
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= KANBAN_SCHEMA_VERSION:
+            print("ℹ️ Kanban database schema is already up to date")
+            return True
+        
         print("🔧 Fixing Kanban database schema...")
         
         # Check existing columns first
         cursor.execute("PRAGMA table_info(applications)")
-        existing_columns = [column[1] for column in cursor.fetchall()]
+        existing_columns = {column['name'] for column in cursor.fetchall()}
         print(f"📋 Found existing columns: {len(existing_columns)}")
         
         # Define columns that need to be added
@@ -37,116 +108,52 @@ def fix_kanban_database():
             ('referral_source', 'TEXT')
         ]
         
-        # Add missing columns one by one
+        missing_columns = []
         for column_name, column_def in columns_to_add:
-            if column_name not in existing_columns:
-                try:
-                    cursor.execute(f"ALTER TABLE applications ADD COLUMN {column_name} {column_def}")
-                    print(f"✅ Added column: {column_name}")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column name" not in str(e).lower():
-                        print(f"⚠️ Warning adding {column_name}: {e}")
-            else:
+            if column_name in existing_columns:
                 print(f"ℹ️ Column {column_name} already exists")
-        
-        # Update stage_entered_date for existing records that don't have it
+            else:
+                missing_columns.append((column_name, column_def))
+        
+        # One script and one write transaction: the ALTERs go ahead of the
+        # DDL because some indexes cover the new columns. executescript()
+        # commits any pending transaction first, so it opens the transaction
+        # itself and everything below runs inside it until conn.commit().
+        alter_sql = "".join(
+            f"ALTER TABLE applications ADD COLUMN {column_name} {column_def};\n"
+            for column_name, column_def in missing_columns
+        )
+        cursor.executescript("BEGIN IMMEDIATE;\n" + alter_sql + KANBAN_DDL)
+        for column_name, _ in missing_columns:
+            print(f"✅ Added column: {column_name}")
+        print("✅ Created/verified Kanban tables and indexes")
+        
+        # Backfill stage_entered_date and board_stage in a single pass over the table
         now = datetime.now().isoformat()
         cursor.execute("""
             UPDATE applications 
-            SET stage_entered_date = ? 
+            SET stage_entered_date = COALESCE(NULLIF(stage_entered_date, ''), ?),
+                board_stage = COALESCE(NULLIF(board_stage, ''), CASE 
+                    WHEN status = 'applied' THEN 'applied'
+                    WHEN status LIKE '%interview%' OR status = 'interview_scheduled' THEN 'interview'
+                    WHEN status = 'offer' THEN 'final'
+                    WHEN status = 'rejected' THEN 'closed'
+                    WHEN status = 'accepted' THEN 'closed'
+                    ELSE 'applied'
+                END)
             WHERE stage_entered_date IS NULL OR stage_entered_date = ''
+               OR board_stage IS NULL OR board_stage = ''
         """, (now,))
         
         updated_rows = cursor.rowcount
-        print(f"📅 Updated stage_entered_date for {updated_rows} existing records")
-        
-        # Ensure board_stage is set for existing applications
-        cursor.execute("""
-            UPDATE applications 
-            SET board_stage = CASE 
-                WHEN status = 'applied' THEN 'applied'
-                WHEN status LIKE '%interview%' OR status = 'interview_scheduled' THEN 'interview'
-                WHEN status = 'offer' THEN 'final'
-                WHEN status = 'rejected' THEN 'closed'
-                WHEN status = 'accepted' THEN 'closed'
-                ELSE 'applied'
-            END
-            WHERE board_stage IS NULL OR board_stage = ''
-        """)
-        
-        board_updates = cursor.rowcount
-        print(f"🎯 Updated board_stage for {board_updates} existing records")
-        
-        # Create additional tables if they don't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stage_transitions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                application_id INTEGER NOT NULL,
-                from_stage TEXT,
-                to_stage TEXT NOT NULL,
-                transition_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                automated BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (application_id) REFERENCES applications (id)
-            )
-        ''')
-        print("✅ Created/verified stage_transitions table")
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS interview_rounds (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                application_id INTEGER NOT NULL,
-                round_type TEXT NOT NULL,
-                scheduled_date TEXT,
-                completed_date TEXT,
-                interviewer_name TEXT,
-                interviewer_email TEXT,
-                interview_link TEXT,
-                notes TEXT,
-                outcome TEXT,
-                feedback TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (application_id) REFERENCES applications (id)
-            )
-        ''')
-        print("✅ Created/verified interview_rounds table")
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS application_notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                application_id INTEGER NOT NULL,
-                note_type TEXT DEFAULT 'general',
-                content TEXT NOT NULL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (application_id) REFERENCES applications (id)
-            )
-        ''')
-        print("✅ Created/verified application_notes table")
-        
-        # Create indexes for better performance
-        indexes = [
-            'CREATE INDEX IF NOT EXISTS idx_board_stage ON applications(board_stage)',
-            'CREATE INDEX IF NOT EXISTS idx_stage_position ON applications(stage_position)',
-            'CREATE INDEX IF NOT EXISTS idx_priority ON applications(priority)',
-            'CREATE INDEX IF NOT EXISTS idx_stage_entered_date ON applications(stage_entered_date)',
-            'CREATE INDEX IF NOT EXISTS idx_transitions_app_id ON stage_transitions(application_id)',
-            'CREATE INDEX IF NOT EXISTS idx_interview_rounds_app_id ON interview_rounds(application_id)',
-            'CREATE INDEX IF NOT EXISTS idx_notes_app_id ON application_notes(application_id)'
-        ]
-        
-        for index_sql in indexes:
-            try:
-                cursor.execute(index_sql)
-            except sqlite3.OperationalError:
-                pass  # Index might already exist
-        
-        print("✅ Created/verified database indexes")
+        print(f"📅 Backfilled stage_entered_date/board_stage for {updated_rows} existing records")
         
+        cursor.execute(f"PRAGMA user_version = {KANBAN_SCHEMA_VERSION}")
         conn.commit()
         
         # Verify the fix by checking the updated schema
         cursor.execute("PRAGMA table_info(applications)")
-        final_columns = [column[1] for column in cursor.fetchall()]
+        final_columns = [column['name'] for column in cursor.fetchall()]
         
         print(f"\n🎉 Database schema update complete!")
         print(f"📊 Total columns: {len(final_columns)}")
@@ -3,6 +3,7 @@ Screenshot and Documentation Generator
 Creates visual documentation for the README
 """
 
+import sys
 import requests
 import json
 from datetime import datetime
@@ -14,13 +15,13 @@ def test_app_and_document():
     
     app_url = "http://localhost:8503"
     
-    # Test if app is running
+    # Test if app is running (HEAD: headers only, no need to download the page bundle)
     try:
-        response = requests.get(app_url, timeout=5)
+        response = requests.head(app_url, timeout=5, allow_redirects=True)
         if response.status_code == 200:
             print("✅ App is running and accessible")
             print(f"   🌐 URL: {app_url}")
-            print(f"   📊 Response Size: {len(response.content)} bytes")
+            print(f"   📊 Response Size: {response.headers.get('Content-Length', 'unknown')} bytes")
         else:
             print(f"❌ App returned status code: {response.status_code}")
             return
@@ -28,9 +29,13 @@ def test_app_and_document():
         print(f"❌ Cannot access app: {e}")
         return
     
+    # The report is collected and written in one go instead of one print() per line
+    report = []
+    emit = report.append
+    
     # Document current features
-    print(f"\n📋 APPLICATION FEATURES DOCUMENTED:")
-    print("-" * 40)
+    emit("\n📋 APPLICATION FEATURES DOCUMENTED:")
+    emit("-" * 40)
     
     features = [
         "🤖 AI-Powered Email Classification (Gemini 2.5 Flash)",
@@ -46,37 +51,37 @@ def test_app_and_document():
     ]
     
     for i, feature in enumerate(features, 1):
-        print(f"{i:2d}. {feature}")
-    
-    print(f"\n🎯 DEMO INSTRUCTIONS FOR SCREENSHOTS:")
-    print("-" * 40)
-    print("1. 📱 Main Dashboard:")
-    print("   - Open http://localhost:8503")
-    print("   - Show both 'List View' and 'Kanban View' options")
-    print("   - Capture the main interface with navigation")
-    
-    print("\n2. 📋 List View:")
-    print("   - Select 'List View' radio button")
-    print("   - Show the table with applications")
-    print("   - Highlight sortable columns and filters")
-    
-    print("\n3. 🎯 Kanban Board:")
-    print("   - Select 'Kanban View' radio button")
-    print("   - Show the 6-stage pipeline")
-    print("   - Capture cards in different stages")
-    
-    print("\n4. 🤖 AI Processing:")
-    print("   - Click 'Fetch and Process Emails'")
-    print("   - Capture the real-time processing messages")
-    print("   - Show classification results with confidence")
-    
-    print("\n5. 📊 Analytics:")
-    print("   - Show the statistics at the top")
-    print("   - Capture any charts or metrics")
+        emit(f"{i:2d}. {feature}")
+    
+    emit("\n🎯 DEMO INSTRUCTIONS FOR SCREENSHOTS:")
+    emit("-" * 40)
+    emit("1. 📱 Main Dashboard:")
+    emit("   - Open http://localhost:8503")
+    emit("   - Show both 'List View' and 'Kanban View' options")
+    emit("   - Capture the main interface with navigation")
+    
+    emit("\n2. 📋 List View:")
+    emit("   - Select 'List View' radio button")
+    emit("   - Show the table with applications")
+    emit("   - Highlight sortable columns and filters")
+    
+    emit("\n3. 🎯 Kanban Board:")
+    emit("   - Select 'Kanban View' radio button")
+    emit("   - Show the 6-stage pipeline")
+    emit("   - Capture cards in different stages")
+    
+    emit("\n4. 🤖 AI Processing:")
+    emit("   - Click 'Fetch and Process Emails'")
+    emit("   - Capture the real-time processing messages")
+    emit("   - Show classification results with confidence")
+    
+    emit("\n5. 📊 Analytics:")
+    emit("   - Show the statistics at the top")
+    emit("   - Capture any charts or metrics")
     
     # Generate feature matrix
-    print(f"\n📊 FEATURE COMPARISON TABLE:")
-    print("-" * 40)
+    emit("\n📊 FEATURE COMPARISON TABLE:")
+    emit("-" * 40)
     
     comparison_data = [
         ["Feature", "Before (Manual)", "After (AI-Powered)"],
@@ -91,61 +96,64 @@ def test_app_and_document():
     ]
     
     for row in comparison_data:
-        print(f"| {row[0]:<20} | {row[1]:<20} | {row[2]:<20} |")
-    
-    print(f"\n🎉 SUCCESS METRICS:")
-    print("-" * 40)
-    print("✅ MVP Development: 100% Complete")
-    print("✅ AI Integration: 98-100% Accuracy")
-    print("✅ Kanban Implementation: Fully Functional")
-    print("✅ Database Schema: 28 columns, 4 tables")
-    print("✅ Test Coverage: 95% pass rate (38/40 tests)")
-    print("✅ UI Responsiveness: <2s load time")
-    print("✅ Email Processing: 50 emails/10 seconds")
+        emit(f"| {row[0]:<20} | {row[1]:<20} | {row[2]:<20} |")
+    
+    emit("\n🎉 SUCCESS METRICS:")
+    emit("-" * 40)
+    emit("✅ MVP Development: 100% Complete")
+    emit("✅ AI Integration: 98-100% Accuracy")
+    emit("✅ Kanban Implementation: Fully Functional")
+    emit("✅ Database Schema: 28 columns, 4 tables")
+    emit("✅ Test Coverage: 95% pass rate (38/40 tests)")
+    emit("✅ UI Responsiveness: <2s load time")
+    emit("✅ Email Processing: 50 emails/10 seconds")
     
     # Create a visual ASCII representation
-    print(f"\n🎨 KANBAN BOARD VISUALIZATION:")
-    print("-" * 60)
-    print("┌─────────┬─────────┬─────────┬─────────┬─────────┬─────────┐")
-    print("│Backlog  │Applied  │Screening│Interview│ Final   │ Closed  │")
-    print("│   (3)   │  (12)   │   (8)   │   (7)   │   (4)   │   (3)   │")
-    print("├─────────┼─────────┼─────────┼─────────┼─────────┼─────────┤")
-    print("│ Google  │TechCorp │ Meta    │Microsoft│ Apple   │OpenAI ✅│")
-    print("│ [HIGH]  │ [MED]   │ [HIGH]  │ [LOW]   │ [HIGH]  │         │")
-    print("│         │         │         │         │         │Netflix❌│")
-    print("│ Amazon  │Uber     │Spotify  │LinkedIn │Salesforce        │")
-    print("│ [MED]   │ [LOW]   │ [MED]   │ [MED]   │ [MED]   │         │")
-    print("└─────────┴─────────┴─────────┴─────────┴─────────┴─────────┘")
-    
-    print(f"\n🚀 GITHUB REPOSITORY SETUP:")
-    print("-" * 40)
-    print("1. 📂 Repository Structure:")
-    print("   - All core files are ready for upload")
-    print("   - README_NEW.md contains comprehensive documentation")
-    print("   - Test suite demonstrates 95% reliability")
-    
-    print("\n2. 🏷️ Recommended Repository Tags:")
-    print("   - job-tracker, ai-powered, streamlit")
-    print("   - kanban-board, gmail-integration, gemini-ai")
-    print("   - python, sqlite, oauth2, email-classification")
-    
-    print("\n3. 📋 GitHub Repository Description:")
-    print('   "🚀 AI-powered job application tracker with Kanban board,')
-    print('    Gmail integration & 98% accurate email classification using Gemini AI"')
-    
-    print(f"\n✨ PROJECT COMPLETION STATUS:")
-    print("=" * 60)
-    print("🎯 ORIGINAL GOALS ACHIEVED:")
-    print("   ✅ Replace 'if else conditional thing' → AI Classification")
-    print("   ✅ Build 'Jira-style board' → Kanban Implementation")
-    print("   ✅ Comprehensive Testing → 95% Pass Rate")
-    
-    print("\n🚀 READY FOR GITHUB DEPLOYMENT!")
-    print("   📄 Documentation: Complete")
-    print("   🧪 Testing: 95% Success Rate")
-    print("   🎨 UI: Fully Functional")
-    print("   🤖 AI: 98-100% Accuracy")
-    print("   📋 Features: Production Ready")
+    emit("\n🎨 KANBAN BOARD VISUALIZATION:")
+    emit("-" * 60)
+    emit("┌─────────┬─────────┬─────────┬─────────┬─────────┬─────────┐")
+    emit("│Backlog  │Applied  │Screening│Interview│ Final   │ Closed  │")
+    emit("│   (3)   │  (12)   │   (8)   │   (7)   │   (4)   │   (3)   │")
+    emit("├─────────┼─────────┼─────────┼─────────┼─────────┼─────────┤")
+    emit("│ Google  │TechCorp │ Meta    │Microsoft│ Apple   │OpenAI ✅│")
+    emit("│ [HIGH]  │ [MED]   │ [HIGH]  │ [LOW]   │ [HIGH]  │         │")
+    emit("│         │         │         │         │         │Netflix❌│")
+    emit("│ Amazon  │Uber     │Spotify  │LinkedIn │Salesforce        │")
+    emit("│ [MED]   │ [LOW]   │ [MED]   │ [MED]   │ [MED]   │         │")
+    emit("└─────────┴─────────┴─────────┴─────────┴─────────┴─────────┘")
+    
+    emit("\n🚀 GITHUB REPOSITORY SETUP:")
+    emit("-" * 40)
+    emit("1. 📂 Repository Structure:")
+    emit("   - All core files are ready for upload")
+    emit("   - README_NEW.md contains comprehensive documentation")
+    emit("   - Test suite demonstrates 95% reliability")
+    
+    emit("\n2. 🏷️ Recommended Repository Tags:")
+    emit("   - job-tracker, ai-powered, streamlit")
+    emit("   - kanban-board, gmail-integration, gemini-ai")
+    emit("   - python, sqlite, oauth2, email-classification")
+    
+    emit("\n3. 📋 GitHub Repository Description:")
+    emit('   "🚀 AI-powered job application tracker with Kanban board,')
+    emit('    Gmail integration & 98% accurate email classification using Gemini AI"')
+    
+    emit("\n✨ PROJECT COMPLETION STATUS:")
+    emit("=" * 60)
+    emit("🎯 ORIGINAL GOALS ACHIEVED:")
+    emit("   ✅ Replace 'if else conditional thing' → AI Classification")
+    emit("   ✅ Build 'Jira-style board' → Kanban Implementation")
+    emit("   ✅ Comprehensive Testing → 95% Pass Rate")
+    
+    emit("\n🚀 READY FOR GITHUB DEPLOYMENT!")
+    emit("   📄 Documentation: Complete")
+    emit("   🧪 Testing: 95% Success Rate")
+    emit("   🎨 UI: Fully Functional")
+    emit("   🤖 AI: 98-100% Accuracy")
+    emit("   📋 Features: Production Ready")
+    
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
     
     return True
 
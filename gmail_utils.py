@@ -5,8 +5,12 @@ Handles OAuth2 authentication and email fetching for interview-related emails.
 
 import os
 import base64
+import json
 import re
-from typing import List, Dict, Optional, Any
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple, Any
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -15,10 +19,52 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from bs4 import BeautifulSoup
 
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
 
 # Gmail API scope for readonly access
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Gmail accepts at most 100 calls per batch request
+GMAIL_BATCH_SIZE = 100
+
+# Worker threads for the one-request-per-message fallback
+GMAIL_FETCH_WORKERS = 10
+
+# messages.list returns at most 500 IDs per page
+GMAIL_LIST_PAGE_SIZE = 500
+
+# Broader query - let smart spam detection handle filtering
+INTERVIEW_QUERY = 'subject:(interview OR "phone screen" OR "interview scheduled" OR "technical interview" OR "final interview" OR "onsite interview" OR "video interview" OR "zoom interview" OR "interview invitation" OR "interview confirmed")'
+
+# Optional Gmail label that a user-created filter applies to interview emails.
+# A label lookup is an indexed server-side query instead of a subject search.
+INTERVIEW_LABEL = os.environ.get('GMAIL_INTERVIEW_LABEL', '')
+
+# Parsed emails by message ID (Gmail message content never changes once sent)
+EMAIL_CACHE_FILE = '.gmail_cache.db'
+EMAIL_CACHE_CHUNK = 500  # IDs per IN (...) lookup, under SQLite's variable limit
+
+# Partial-response masks: only what the list/parse code reads
+# (decode_email_body walks mimeType, body.data and nested parts)
+LIST_FIELDS = 'messages/id,nextPageToken'
+MESSAGE_FIELDS = 'id,snippet,payload(headers,mimeType,body/data,parts)'
+
+
+# (token.json mtime, service) from the last get_gmail_service() call
+_service_cache = None
+
+
+def _save_token(creds: Credentials):
+    """Write token.json atomically, so an interrupted write can't corrupt it."""
+    tmp_path = 'token.json.tmp'
+    with open(tmp_path, 'w') as token:
+        token.write(creds.to_json())
+    os.replace(tmp_path, 'token.json')
+
 
 def get_gmail_service():
     """
@@ -31,6 +77,14 @@ def get_gmail_service():
         FileNotFoundError: If credentials.json is not found
         Exception: If authentication fails
     """
+    global _service_cache
+    
+    # Reuse the service built from this exact token file; its credentials
+    # refresh themselves when the access token expires
+    if _service_cache is not None and os.path.exists('token.json'):
+        if os.path.getmtime('token.json') == _service_cache[0]:
+            return _service_cache[1]
+    
     creds = None
     
     # Token file stores user's access and refresh tokens
@@ -79,53 +133,104 @@ def get_gmail_service():
                     raise Exception(f"OAuth authentication failed. Error: {e}")
         
         # Save credentials for next run
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
+        _save_token(creds)
     
-    return build('gmail', 'v1', credentials=creds)
+    # Refresh a token that is about to expire in the background, off the request path
+    if hasattr(creds, 'with_non_blocking_refresh'):
+        creds.with_non_blocking_refresh()
+    
+    service = build('gmail', 'v1', credentials=creds)
+    _service_cache = (os.path.getmtime('token.json'), service)
+    return service
 
 
-def decode_email_body(payload: Dict[str, Any]) -> str:
+def html_to_text(html_content: str) -> str:
     """
-    Extract and decode email body from Gmail message payload.
+    Convert an HTML email body to plain text.
+    
+    Uses selectolax's (lexbor) C parser when it's installed and falls back to
+    BeautifulSoup's pure-Python html.parser otherwise.
     
     Args:
-        payload: Gmail message payload
+        html_content: Decoded HTML markup
         
     Returns:
-        str: Decoded email body text
+        str: Visible text, with text nodes separated by spaces
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        tree.strip_tags(['script', 'style'])
+        root = tree.body or tree.root
+        return root.text(separator=' ', strip=True) if root is not None else ''
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return soup.get_text(separator=' ', strip=True)
+
+
+def _preferred_alternative(parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pick the one multipart/alternative part worth decoding.
+    
+    Alternatives carry the same content, so only one is decoded: text/plain
+    when it has data, then text/html, then the last (richest) part.
     """
-    body_text = ""
+    for mime_type in ('text/plain', 'text/html'):
+        for part in parts:
+            if part.get('mimeType') == mime_type and part.get('body', {}).get('data'):
+                return [part]
+    return parts[-1:]
+
+
+def _extract_text(parts: List[Dict[str, Any]]) -> str:
+    """Extract text from MIME parts depth-first, walking nested parts with a stack."""
+    b64decode = base64.urlsafe_b64decode
+    texts = []
+    stack = list(reversed(parts))
     
-    def extract_text_from_part(part: Dict[str, Any]) -> str:
-        """Recursively extract text from email parts."""
-        text = ""
+    while stack:
+        part = stack.pop()
+        mime_type = part.get('mimeType')
         
-        if part.get('mimeType') == 'text/plain':
+        if mime_type == 'text/plain' or mime_type == 'text/html':
             data = part.get('body', {}).get('data', '')
             if data:
-                text = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-        elif part.get('mimeType') == 'text/html':
-            data = part.get('body', {}).get('data', '')
-            if data:
-                html_content = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+                text = b64decode(data).decode('utf-8', errors='ignore')
                 # Convert HTML to plain text
-                soup = BeautifulSoup(html_content, 'html.parser')
-                text = soup.get_text(separator=' ', strip=True)
+                texts.append(html_to_text(text) if mime_type == 'text/html' else text)
         elif 'parts' in part:
-            # Handle multipart messages
-            for subpart in part['parts']:
-                text += extract_text_from_part(subpart)
-                
-        return text
+            # Handle multipart messages (reversed, so parts pop in order)
+            subparts = part['parts']
+            if mime_type == 'multipart/alternative':
+                subparts = _preferred_alternative(subparts)
+            stack.extend(reversed(subparts))
+    
+    return ''.join(texts)
+
+
+def decode_email_body(payload: Dict[str, Any]) -> str:
+    """
+    Extract and decode email body from Gmail message payload.
     
-    if 'parts' in payload:
-        for part in payload['parts']:
-            body_text += extract_text_from_part(part)
-    else:
-        body_text = extract_text_from_part(payload)
+    Args:
+        payload: Gmail message payload
+        
+    Returns:
+        str: Decoded email body text
+    """
+    return _extract_text([payload]).strip()
+
+
+def get_header_map(headers: List[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Index Gmail message headers by lowercased name, in one pass.
     
-    return body_text.strip()
+    Args:
+        headers: List of email headers
+        
+    Returns:
+        Dict[str, str]: Header values keyed by lowercased name (first occurrence wins)
+    """
+    return {header.get('name', '').lower(): header.get('value', '') for header in reversed(headers)}
 
 
 def get_header_value(headers: List[Dict[str, str]], name: str) -> str:
@@ -145,14 +250,307 @@ def get_header_value(headers: List[Dict[str, str]], name: str) -> str:
     return ''
 
 
-def fetch_interview_emails(service, query: str = None, max_results: int = 50) -> List[Dict[str, Any]]:
+def get_messages_batch(service, message_ids: List[str], **get_kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch Gmail messages through batch requests instead of one HTTP round trip each.
+    
+    Args:
+        service: Authenticated Gmail service
+        message_ids: IDs of the messages to fetch
+        **get_kwargs: Extra arguments for users().messages().get() (e.g. format='full')
+        
+    Returns:
+        Dict[str, Dict]: Message resources keyed by message ID; messages that
+        failed to fetch are logged and left out
+    """
+    messages = {}
+    
+    def collect_message(request_id, response, exception):
+        if exception is not None:
+            print(f"Error fetching message {request_id}: {exception}")
+            return
+        messages[request_id] = response
+    
+    for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=collect_message)
+        for message_id in message_ids[start:start + GMAIL_BATCH_SIZE]:
+            batch.add(
+                service.users().messages().get(userId='me', id=message_id, **get_kwargs),
+                request_id=message_id
+            )
+        batch.execute()
+    
+    return messages
+
+
+def get_messages_threaded(service, message_ids: List[str], max_workers: int = GMAIL_FETCH_WORKERS,
+                          **get_kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch Gmail messages with concurrent single requests (fallback for batching).
+    
+    httplib2 connections are not thread-safe, so each worker thread builds its
+    own Gmail service from the given service's credentials. If the credentials
+    can't be found, messages are fetched one at a time on the given service.
+    
+    Args:
+        service: Authenticated Gmail service
+        message_ids: IDs of the messages to fetch
+        max_workers: Number of concurrent requests
+        **get_kwargs: Extra arguments for users().messages().get() (e.g. format='full')
+        
+    Returns:
+        Dict[str, Dict]: Message resources keyed by message ID; messages that
+        failed to fetch are logged and left out
+    """
+    credentials = getattr(getattr(service, '_http', None), 'credentials', None)
+    thread_local = threading.local()
+    
+    def worker_service():
+        if credentials is None:
+            return service
+        if not hasattr(thread_local, 'service'):
+            thread_local.service = build('gmail', 'v1', credentials=credentials, cache_discovery=False)
+        return thread_local.service
+    
+    def fetch_message(message_id):
+        try:
+            return message_id, worker_service().users().messages().get(
+                userId='me', id=message_id, **get_kwargs
+            ).execute()
+        except HttpError as error:
+            print(f"Error fetching message {message_id}: {error}")
+            return message_id, None
+    
+    with ThreadPoolExecutor(max_workers=max_workers if credentials is not None else 1) as executor:
+        return {
+            message_id: message
+            for message_id, message in executor.map(fetch_message, message_ids)
+            if message is not None
+        }
+
+
+def iter_message_id_pages(service, query: str, max_results: int) -> Iterator[List[str]]:
+    """
+    Yield the IDs of messages matching a search, one result page at a time.
+    
+    Args:
+        service: Authenticated Gmail service
+        query: Gmail search query
+        max_results: Maximum number of IDs to yield in total
+        
+    Yields:
+        List[str]: Message IDs from one page (newest first)
+    """
+    messages_api = service.users().messages()
+    request = messages_api.list(
+        userId='me',
+        q=query,
+        maxResults=min(max_results, GMAIL_LIST_PAGE_SIZE),
+        fields=LIST_FIELDS
+    )
+    remaining = max_results
+    
+    while request is not None and remaining > 0:
+        response = request.execute()
+        message_ids = [msg['id'] for msg in response.get('messages', [])][:remaining]
+        if message_ids:
+            yield message_ids
+        remaining -= len(message_ids)
+        request = messages_api.list_next(request, response)
+
+
+def fetch_messages(service, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch full messages, batched, with a concurrent fallback for anything the batch missed.
+    
+    Args:
+        service: Authenticated Gmail service
+        message_ids: IDs of the messages to fetch
+        
+    Returns:
+        Dict[str, Dict]: Message resources keyed by message ID
+    """
+    # Up to GMAIL_BATCH_SIZE messages per HTTP request
+    try:
+        fetched = get_messages_batch(service, message_ids, format='full', fields=MESSAGE_FIELDS)
+    except HttpError as error:
+        print(f"Batch fetch failed, falling back to concurrent requests: {error}")
+        fetched = {}
+    
+    # Retry anything the batch didn't return (e.g. per-call rate limits) concurrently
+    missing_ids = [message_id for message_id in message_ids if message_id not in fetched]
+    if missing_ids:
+        fetched.update(get_messages_threaded(service, missing_ids, format='full', fields=MESSAGE_FIELDS))
+    
+    return fetched
+
+
+def parse_message(message_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the fields the tracker uses from a Gmail message resource.
+    
+    Args:
+        message_id: Gmail message ID
+        message: Message resource fetched with format='full'
+        
+    Returns:
+        Dict: message_id, subject, from, date, snippet and body
+    """
+    payload = message.get('payload', {})
+    headers = get_header_map(payload.get('headers', []))
+    
+    return {
+        'message_id': message_id,
+        'subject': headers.get('subject', ''),
+        'from': headers.get('from', ''),
+        'date': headers.get('date', ''),
+        'snippet': message.get('snippet', ''),
+        'body': decode_email_body(payload)
+    }
+
+
+def open_email_cache(path: str = EMAIL_CACHE_FILE) -> Optional[sqlite3.Connection]:
+    """
+    Open (creating if needed) the on-disk cache of parsed emails.
+    
+    Returns:
+        sqlite3.Connection or None if the cache can't be opened
+    """
+    try:
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS messages (id TEXT PRIMARY KEY, email TEXT NOT NULL)')
+            # Last synced mailbox historyId and result IDs, per search
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sync_state '
+                '(search TEXT PRIMARY KEY, history_id TEXT NOT NULL, message_ids TEXT NOT NULL)'
+            )
+        return conn
+    except sqlite3.Error as e:
+        print(f"Email cache unavailable, fetching everything: {e}")
+        return None
+
+
+def get_cached_emails(conn: sqlite3.Connection, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up already-parsed emails.
+    
+    Args:
+        conn: Connection from open_email_cache()
+        message_ids: IDs to look up
+        
+    Returns:
+        Dict[str, Dict]: Parsed email data keyed by message ID, for the IDs that are cached
+    """
+    cached = {}
+    for start in range(0, len(message_ids), EMAIL_CACHE_CHUNK):
+        chunk = message_ids[start:start + EMAIL_CACHE_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        for message_id, email in conn.execute(
+            f'SELECT id, email FROM messages WHERE id IN ({placeholders})', chunk
+        ):
+            cached[message_id] = json.loads(email)
+    return cached
+
+
+def cache_emails(conn: sqlite3.Connection, emails: List[Dict[str, Any]]):
+    """
+    Store parsed emails in the cache, in one transaction.
+    
+    Args:
+        conn: Connection from open_email_cache()
+        emails: Parsed email data (as returned by parse_message)
+    """
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO messages (id, email) VALUES (?, ?)',
+            [(email['message_id'], json.dumps(email)) for email in emails]
+        )
+
+
+def get_sync_state(conn: sqlite3.Connection, search: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Get the historyId and result IDs stored by the last sync of a search.
+    
+    Returns:
+        Tuple: (history_id or None if never synced, message IDs in list order)
+    """
+    row = conn.execute('SELECT history_id, message_ids FROM sync_state WHERE search = ?', (search,)).fetchone()
+    if row is None:
+        return None, []
+    return row[0], json.loads(row[1])
+
+
+def save_sync_state(conn: sqlite3.Connection, search: str, history_id: str, message_ids: List[str]):
+    """Record the mailbox historyId a search's results are current as of."""
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO sync_state (search, history_id, message_ids) VALUES (?, ?, ?)',
+            (search, history_id, json.dumps(message_ids))
+        )
+
+
+def get_mailbox_changes(service, start_history_id: str, label_changes: bool = False) -> Tuple[bool, str]:
+    """
+    Check whether messages were added to or deleted from the mailbox since a historyId.
+    
+    Args:
+        service: Authenticated Gmail service
+        start_history_id: historyId from an earlier sync
+        label_changes: Also count labels added to or removed from messages
+            (needed when the search is label-based)
+        
+    Returns:
+        Tuple[bool, str]: (changed, current historyId). An expired start
+        historyId (HTTP 404) counts as changed.
+    """
+    history_types = ['messageAdded', 'messageDeleted']
+    if label_changes:
+        history_types += ['labelAdded', 'labelRemoved']
+    
+    try:
+        response = service.users().history().list(
+            userId='me',
+            startHistoryId=start_history_id,
+            historyTypes=history_types,
+            maxResults=1,
+            fields='history/id,historyId'
+        ).execute()
+    except HttpError as error:
+        if getattr(error, 'resp', None) is not None and error.resp.status == 404:
+            profile = service.users().getProfile(userId='me', fields='historyId').execute()
+            return True, profile['historyId']
+        raise
+    
+    return bool(response.get('history')), response['historyId']
+
+
+def default_interview_query() -> str:
+    """
+    Gmail search used by fetch_interview_emails when no query is given.
+    
+    Returns:
+        str: label:<GMAIL_INTERVIEW_LABEL> when that label is configured,
+        otherwise the INTERVIEW_QUERY subject search
+    """
+    if INTERVIEW_LABEL:
+        # Gmail search spells spaces and slashes in label names as dashes
+        return 'label:' + re.sub(r'[\s/]+', '-', INTERVIEW_LABEL.strip())
+    return INTERVIEW_QUERY
+
+
+def fetch_interview_emails(service, query: str = None, max_results: int = 50,
+                           use_cache: bool = True) -> List[Dict[str, Any]]:
     """
     Fetch interview-related emails from Gmail.
     
     Args:
         service: Authenticated Gmail service
-        query: Gmail search query (default: interview-related keywords)
+        query: Gmail search query (default: default_interview_query())
         max_results: Maximum number of emails to fetch
+        use_cache: Reuse emails parsed on earlier runs (EMAIL_CACHE_FILE), only
+            fetch messages that haven't been seen before, and skip the search
+            entirely when the mailbox hasn't changed since the last sync
         
     Returns:
         List[Dict]: List of parsed email data
@@ -161,54 +559,69 @@ def fetch_interview_emails(service, query: str = None, max_results: int = 50) ->
         HttpError: If Gmail API request fails
     """
     if query is None:
-        # Broader query - let smart spam detection handle filtering
-        query = 'subject:(interview OR "phone screen" OR "interview scheduled" OR "technical interview" OR "final interview" OR "onsite interview" OR "video interview" OR "zoom interview" OR "interview invitation" OR "interview confirmed")'
+        query = default_interview_query()
+    
+    cache_conn = open_email_cache() if use_cache else None
     
     try:
-        # Search for messages matching the query
-        results = service.users().messages().list(
-            userId='me', 
-            q=query, 
-            maxResults=max_results
-        ).execute()
+        history_id = None
         
-        messages = results.get('messages', [])
+        if cache_conn:
+            # Taken before the search, so changes made while it runs show up next time
+            profile = service.users().getProfile(userId='me', fields='emailAddress,historyId').execute()
+            history_id = profile['historyId']
+            # Sync state is per account: the same search means different mail elsewhere
+            sync_key = f"{profile['emailAddress']}\n{query}\n{max_results}"
+            
+            # Incremental sync: a history check instead of re-running the search
+            last_history_id, last_ids = get_sync_state(cache_conn, sync_key)
+            if last_history_id:
+                changed = False
+                if last_history_id != history_id:
+                    # Label searches go stale when a message gains or loses the label
+                    changed, history_id = get_mailbox_changes(
+                        service, last_history_id, label_changes='label:' in query
+                    )
+                if not changed:
+                    cached = get_cached_emails(cache_conn, last_ids)
+                    if len(cached) == len(last_ids):
+                        print(f"No mailbox changes since last sync, reusing {len(last_ids)} cached emails")
+                        save_sync_state(cache_conn, sync_key, history_id, last_ids)
+                        return [cached[message_id] for message_id in last_ids]
         
-        if not messages:
-            print(f"No messages found matching query")
-            return []
+        interview_emails = []
+        listed_ids = []
         
-        print(f"Found {len(messages)} potential interview emails")
+        # Fetch each page of search results as soon as its IDs arrive
+        for message_ids in iter_message_id_pages(service, query, max_results):
+            listed_ids.extend(message_ids)
+            print(f"Found {len(listed_ids)} potential interview emails so far")
+            
+            # Only messages not parsed on an earlier run go over the network
+            parsed = get_cached_emails(cache_conn, message_ids) if cache_conn else {}
+            new_ids = [message_id for message_id in message_ids if message_id not in parsed]
+            
+            if new_ids:
+                fetched = fetch_messages(service, new_ids)
+                new_emails = [
+                    parse_message(message_id, fetched[message_id])
+                    for message_id in new_ids
+                    if fetched.get(message_id)
+                ]
+                if cache_conn and new_emails:
+                    cache_emails(cache_conn, new_emails)
+                parsed.update((email['message_id'], email) for email in new_emails)
+            
+            # Keep the order returned by the list call (newest first)
+            interview_emails.extend(parsed[message_id] for message_id in message_ids if message_id in parsed)
         
-        # Fetch full message details
-        interview_emails = []
+        if cache_conn:
+            # Messages that failed to fetch aren't cached, so they force a full sync next time
+            save_sync_state(cache_conn, sync_key, history_id, listed_ids)
         
-        for msg in messages:
-            try:
-                message = service.users().messages().get(
-                    userId='me', 
-                    id=msg['id'],
-                    format='full'
-                ).execute()
-                
-                payload = message['payload']
-                headers = payload.get('headers', [])
-                
-                # Extract email details
-                email_data = {
-                    'message_id': msg['id'],
-                    'subject': get_header_value(headers, 'Subject'),
-                    'from': get_header_value(headers, 'From'),
-                    'date': get_header_value(headers, 'Date'),
-                    'snippet': message.get('snippet', ''),
-                    'body': decode_email_body(payload)
-                }
-                
-                interview_emails.append(email_data)
-                
-            except HttpError as error:
-                print(f"Error fetching message {msg['id']}: {error}")
-                continue
+        if not listed_ids:
+            print(f"No messages found matching query")
+            return []
         
         print(f"Successfully fetched {len(interview_emails)} interview emails")
         return interview_emails
@@ -216,6 +629,9 @@ def fetch_interview_emails(service, query: str = None, max_results: int = 50) ->
     except HttpError as error:
         print(f"Error searching for messages: {error}")
         raise
+    finally:
+        if cache_conn:
+            cache_conn.close()
 
 
 def test_gmail_connection():
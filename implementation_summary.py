@@ -7,35 +7,39 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-print("🎯 AI-POWERED EMAIL CLASSIFICATION IMPLEMENTATION COMPLETE!")
-print("="*70)
-print()
-print("✅ SUCCESSFULLY REPLACED:")
-print("   • Old hardcoded 'if-else conditional' spam detection")  
-print("   • Rule-based email classification")
-print("   • Manual company/role extraction")
-print()
-print("🚀 NEW AI-POWERED FEATURES:")
-print("   • Gemini 2.5 Flash model for intelligent classification")
-print("   • Context-aware email categorization")
-print("   • Automatic company and role extraction")
-print("   • Confidence scoring for reliability")
-print("   • Interview scheduling detection")
-print("   • Promotional/spam email filtering")
-print()
-print("📊 IMPROVEMENTS OBSERVED:")
-print("   • More accurate email categorization")
-print("   • Better filtering of promotional content") 
-print("   • Intelligent company name extraction")
-print("   • Context-aware status suggestions")
-print("   • Adaptable to new email patterns")
-print()
-print("🔧 TECHNICAL IMPLEMENTATION:")
-print("   • GeminiEmailClassifier class with structured output")
-print("   • EmailClassification dataclass for type safety")
-print("   • Integrated into main Streamlit application")
-print("   • Fallback to rule-based classification if needed")
-print("   • Environment-based API key management")
-print()
-print("🎉 The job tracker now uses AI instead of hardcoded rules!")
-print("   No more 'if else conditional thing' - it's all AI-powered!")
\ No newline at end of file
+# Printed with a single write instead of one print() per line
+SUMMARY = """\
+🎯 AI-POWERED EMAIL CLASSIFICATION IMPLEMENTATION COMPLETE!
+======================================================================
+
+✅ SUCCESSFULLY REPLACED:
+   • Old hardcoded 'if-else conditional' spam detection
+   • Rule-based email classification
+   • Manual company/role extraction
+
+🚀 NEW AI-POWERED FEATURES:
+   • Gemini 2.5 Flash model for intelligent classification
+   • Context-aware email categorization
+   • Automatic company and role extraction
+   • Confidence scoring for reliability
+   • Interview scheduling detection
+   • Promotional/spam email filtering
+
+📊 IMPROVEMENTS OBSERVED:
+   • More accurate email categorization
+   • Better filtering of promotional content
+   • Intelligent company name extraction
+   • Context-aware status suggestions
+   • Adaptable to new email patterns
+
+🔧 TECHNICAL IMPLEMENTATION:
+   • GeminiEmailClassifier class with structured output
+   • EmailClassification dataclass for type safety
+   • Integrated into main Streamlit application
+   • Fallback to rule-based classification if needed
+   • Environment-based API key management
+
+🎉 The job tracker now uses AI instead of hardcoded rules!
+   No more 'if else conditional thing' - it's all AI-powered!"""
+
+print(SUMMARY)
@@ -18,6 +18,12 @@ BOARD_STAGES = {
     'closed': {'order': 5, 'name': 'Closed', 'type': 'completed'}
 }
 
+# Stage lookups derived once from BOARD_STAGES
+STAGE_ORDER = tuple(sorted(BOARD_STAGES, key=lambda stage: BOARD_STAGES[stage]['order']))
+STAGE_INDEX = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+NEXT_STAGE = dict(zip(STAGE_ORDER, STAGE_ORDER[1:]))
+ACTIVE_STAGES = tuple(stage for stage in STAGE_ORDER if BOARD_STAGES[stage]['type'] == 'active')
+
 def upgrade_database_for_kanban():
     """Upgrade the existing database schema to support Kanban board features"""
     
@@ -0,0 +1,37 @@
+"""
+Cached Read Models for the Streamlit UI
+Board, stats and upcoming-interview reads shared by the app and demo controls,
+cached until a write through the UI invalidates them.
+"""
+
+import streamlit as st
+
+from db_utils import get_application_stats, get_upcoming_interviews
+
+
+# Shared across sessions; writes made through the UI clear them with
+# invalidate_cached_reads(), while plain reruns hit the cache
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_board_data():
+    """Board data for the Kanban view (cached until the next UI write)"""
+    from kanban_database import get_board_data
+    return get_board_data()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_stats():
+    """Sidebar statistics (cached until the next UI write)"""
+    return get_application_stats()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_upcoming_interviews(days_ahead: int = 7):
+    """Upcoming interviews (cached until the next UI write)"""
+    return get_upcoming_interviews(days_ahead=days_ahead)
+
+
+def invalidate_cached_reads():
+    """Invalidate cached reads after the applications table changes"""
+    cached_board_data.clear()
+    cached_stats.clear()
+    cached_upcoming_interviews.clear()
@@ -38,6 +38,10 @@ def start_gmail_oauth():
     Start Gmail OAuth flow
     Returns authorization URL for user to visit
     """
+    # Reuse the session's flow, so reruns don't rebuild it or its URL
+    if 'oauth_flow' in st.session_state and 'oauth_auth_url' in st.session_state:
+        return st.session_state.oauth_auth_url
+    
     try:
         client_config = get_oauth_config()
         
@@ -57,6 +61,7 @@ def start_gmail_oauth():
         
         # Store flow in session for later use
         st.session_state.oauth_flow = flow
+        st.session_state.oauth_auth_url = auth_url
         
         return auth_url
         
@@ -87,7 +92,8 @@ def complete_gmail_oauth(auth_code: str):
             'token_uri': credentials.token_uri,
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
-            'scopes': credentials.scopes
+            'scopes': credentials.scopes,
+            'expiry': _expiry_str(credentials)
         }
         
         # Mark as authenticated
@@ -95,6 +101,7 @@ def complete_gmail_oauth(auth_code: str):
         
         # Clean up flow
         del st.session_state.oauth_flow
+        st.session_state.pop('oauth_auth_url', None)
         
         return True
         
@@ -102,6 +109,12 @@ def complete_gmail_oauth(auth_code: str):
         st.error(f"❌ OAuth completion failed: {e}")
         return False
 
+def _expiry_str(credentials) -> Optional[str]:
+    """Access token expiry in the format Credentials.from_authorized_user_info reads"""
+    if credentials.expiry is None:
+        return None
+    return credentials.expiry.isoformat() + 'Z'
+
 def get_gmail_service():
     """
     Get authenticated Gmail service
@@ -125,13 +138,19 @@ def get_gmail_service():
                 
                 # Update session with new token
                 st.session_state.gmail_credentials.update({
-                    'token': credentials.token
+                    'token': credentials.token,
+                    'expiry': _expiry_str(credentials)
                 })
             else:
                 st.error("❌ Gmail credentials expired. Please re-authenticate.")
                 st.session_state.gmail_authenticated = False
                 return None
         
+        # With the expiry known, google-auth refreshes a token that is about to
+        # expire in a background thread instead of blocking the next API call
+        if hasattr(credentials, 'with_non_blocking_refresh'):
+            credentials.with_non_blocking_refresh()
+        
         # Build Gmail service
         service = build('gmail', 'v1', credentials=credentials)
         return service
@@ -141,6 +160,18 @@ def get_gmail_service():
         st.session_state.gmail_authenticated = False
         return None
 
+def get_cached_gmail_service():
+    """
+    Get the session's Gmail service, building it only once per session
+    Returns Gmail API service object
+    """
+    service = st.session_state.get('gmail_service')
+    if service is None:
+        service = get_gmail_service()
+        if service is not None:
+            st.session_state.gmail_service = service
+    return service
+
 def show_gmail_oauth_flow():
     """
     Show Gmail OAuth authentication flow
@@ -164,7 +195,8 @@ def show_gmail_oauth_flow():
     # Start OAuth flow
     st.markdown("### 🔐 Gmail Authentication")
     
-    if st.button("🚀 **Start Gmail Authentication**", type="primary"):
+    # Once started, keep showing the steps (and the code input) on every rerun
+    if 'oauth_flow' in st.session_state or st.button("🚀 **Start Gmail Authentication**", type="primary"):
         auth_url = start_gmail_oauth()
         
         if auth_url:
@@ -200,7 +232,9 @@ def disconnect_gmail():
     gmail_keys = [
         'gmail_authenticated',
         'gmail_credentials', 
+        'gmail_service',
         'oauth_flow',
+        'oauth_auth_url',
         'gmail_auth_code'
     ]
     
@@ -215,7 +249,7 @@ def fetch_session_emails(max_results: int = 50) -> List[Dict[str, Any]]:
     Fetch emails from Gmail using session credentials
     Returns list of email data
     """
-    service = get_gmail_service()
+    service = get_cached_gmail_service()
     if not service:
         st.error("❌ Gmail not connected. Please authenticate first.")
         return []
@@ -252,4 +286,51 @@ def fetch_session_emails(max_results: int = 50) -> List[Dict[str, Any]]:
         
     except Exception as e:
         st.error(f"❌ Error fetching emails: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def fetch_session_emails_batch(max_results: int = 50, service=None) -> List[Dict[str, Any]]:
+    """
+    Fetch emails like fetch_session_emails, but retrieve the message bodies
+    through Gmail batch requests instead of one HTTP round trip per message.
+    Returns parsed email data (message_id, subject, from, date, snippet, body)
+    """
+    from gmail_utils import LIST_FIELDS, fetch_messages, parse_message
+    
+    service = service or get_cached_gmail_service()
+    if not service:
+        st.error("❌ Gmail not connected. Please authenticate first.")
+        return []
+    
+    try:
+        # Search for job-related emails
+        query = 'subject:(interview OR application OR position OR job OR hiring OR recruiter)'
+        
+        # Get message list
+        results = service.users().messages().list(
+            userId='me',
+            q=query,
+            maxResults=max_results,
+            fields=LIST_FIELDS
+        ).execute()
+        
+        message_ids = [message['id'] for message in results.get('messages', [])]
+        
+        if not message_ids:
+            st.info("📧 No job-related emails found with current search criteria.")
+            return []
+        
+        # Batched, with a concurrent retry for messages the batch dropped (e.g. per-call 429s)
+        raw_messages = fetch_messages(service, message_ids)
+        
+        # Keep the order returned by the list call (newest first)
+        emails = [
+            parse_message(message_id, raw_messages[message_id])
+            for message_id in message_ids
+            if raw_messages.get(message_id)
+        ]
+        
+        return emails
+        
+    except Exception as e:
+        st.error(f"❌ Error fetching emails: {e}")
+        return []
@@ -179,6 +179,13 @@ def initialize_key_system():
     if 'show_key_setup' not in st.session_state:
         st.session_state.show_key_setup = False
 
+# Bounded, so keys that stop being used release their classifier's caches
+@st.cache_resource(show_spinner=False, max_entries=32, ttl=3600)
+def _gemini_classifier_for_key(api_key: str):
+    """Create one Gemini classifier per API key, shared across reruns"""
+    from ai_email_classifier import GeminiEmailClassifier
+    return GeminiEmailClassifier(api_key=api_key)
+
 def create_configured_gemini_classifier():
     """Create Gemini classifier with user's API key"""
     user_key = get_user_gemini_key()
@@ -188,17 +195,8 @@ def create_configured_gemini_classifier():
         return None
     
     try:
-        from ai_email_classifier import GeminiEmailClassifier
-        
-        # Create classifier with user's key
-        classifier = GeminiEmailClassifier()
-        
-        # Override the API key (we'll need to modify GeminiEmailClassifier to accept key)
-        # For now, we'll set it in environment temporarily
-        import os
-        os.environ['GEMINI_API_KEY'] = user_key
-        
-        return classifier
+        # Reuse the classifier (key-bound HTTP session, caches, worker pool) built for this key
+        return _gemini_classifier_for_key(user_key)
         
     except Exception as e:
         st.error(f"❌ Error configuring Gemini classifier: {e}")